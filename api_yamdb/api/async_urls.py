@@ -0,0 +1,6 @@
+from .async_views import async_patterns
+from .urls import urlpatterns as sync_urlpatterns
+
+# Маршруты произведений, отзывов и комментариев обслуживают асинхронные
+# представления, остальные — синхронные с учётом запросов к БД.
+urlpatterns = async_patterns(sync_urlpatterns)
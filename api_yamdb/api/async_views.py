@@ -0,0 +1,78 @@
+"""Асинхронный путь чтения для запуска под ASGI.
+
+В Django 3.2 ORM синхронный, поэтому представления DRF выполняются в пуле
+потоков через sync_to_async(thread_sensitive=False): цикл событий
+обслуживает медленных клиентов, а запросы к БД идут параллельно, а не по
+очереди в единственном потоке, как у синхронных представлений под ASGI.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import URLPattern, URLResolver
+
+from core.middleware import track_queries
+
+ASYNC_BASENAMES = ('titles', 'reviews', 'comments')
+
+
+def run_view(view, request, *args, **kwargs):
+    # Потоки пула живут дольше запроса: закрываем их соединения
+    # так же, как обработчик делает это на границах запроса.
+    close_old_connections()
+    try:
+        with track_queries(request):
+            return view(request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """Оборачивает синхронное представление в корутину."""
+    run = sync_to_async(run_view, thread_sensitive=False)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run(view, request, *args, **kwargs)
+
+    return wrapper
+
+
+def tracked_view(view):
+    """Подключает учёт запросов к БД к синхронному представлению.
+
+    Под ASGI Django выполняет синхронные представления в своём потоке,
+    и учёт из middleware туда не попадает; обёртка включает его в том же
+    потоке, где выполняется представление.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with track_queries(request):
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def async_patterns(patterns, basenames=ASYNC_BASENAMES):
+    """Заменяет представления маршрутов basenames на асинхронные.
+
+    Остальные представления остаются синхронными, но с учётом запросов
+    к БД; вложенные include обходятся рекурсивно.
+    """
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(
+                pattern.pattern,
+                async_patterns(pattern.url_patterns, basenames),
+                pattern.default_kwargs, pattern.app_name, pattern.namespace
+            )
+        else:
+            basename = (pattern.name or '').rsplit('-', 1)[0]
+            wrap = async_view if basename in basenames else tracked_view
+            pattern = URLPattern(
+                pattern.pattern, wrap(pattern.callback),
+                pattern.default_args, pattern.name
+            )
+        result.append(pattern)
+    return result
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+CATEGORIES = 'categories'
+GENRES = 'genres'
+TITLES = 'titles'
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE]
+
+
+def get_version(namespace):
+    """Текущее поколение кэша раздела.
+
+    Начальное значение берётся из времени, поэтому после вытеснения
+    ключа старые записи не становятся снова актуальными.
+    """
+    cache = get_cache()
+    key = f'catalog:{namespace}:version'
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def invalidate(*namespaces):
+    """Сбрасывает кэш разделов после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: bump_versions(namespaces))
+
+
+def bump_versions(namespaces):
+    cache = get_cache()
+    for namespace in namespaces:
+        key = f'catalog:{namespace}:version'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def make_key(namespace, request):
+    path = hashlib.md5(
+        request.get_full_path().encode('utf-8')
+    ).hexdigest()
+    return (
+        f'catalog:{namespace}:{get_version(namespace)}:'
+        f'{request.accepted_renderer.format}:{path}'
+    )
+
+
+def make_etag(data):
+    content = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return f'"{hashlib.md5(content).hexdigest()}"'
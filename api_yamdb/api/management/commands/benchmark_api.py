@@ -0,0 +1,450 @@
+import asyncio
+import itertools
+import json
+import random
+import re
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from core import confirmation_codes
+from core.jwt_authentication import RoleAccessToken
+from reviews.constants import ADMIN
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+BATCH_SIZE = 1000
+API = '/api/v1'
+ASGI_URLCONF = 'api_yamdb.asgi_urls'
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+# SQLite допускает одного писателя, а транзакция, начатая чтением,
+# при встречной записи сразу получает "database is locked": на нём эти
+# сценарии выполняются без параллелизма.
+WRITE_SCENARIOS = {
+    'auth-signup', 'reviews-create', 'reviews-update', 'comments-create',
+    'comments-delete', 'titles-bulk-update',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест маршрутов /api/v1 — чтение, регистрация и токен, '
+        'создание, изменение и удаление отзывов и комментариев, статистика '
+        'и пакетное изменение произведений — через WSGI- и/или '
+        'ASGI-обработчик на синтетических данных во временной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--titles', type=int, default=200)
+        parser.add_argument('--reviews-per-title', type=int, default=5)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Запросов на каждый сценарий.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Потоков для WSGI или одновременных задач в цикле для ASGI.'
+        )
+        parser.add_argument(
+            '--interface', choices=('wsgi', 'asgi', 'both'), default='wsgi',
+            help='Обработчик; both сравнивает оба на одних данных.'
+        )
+        parser.add_argument(
+            '--only', default='',
+            help='Сценарии через запятую, например titles-list,reviews-list.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--save-baseline', metavar='PATH',
+            help='Сохранить результаты в JSON-файл.'
+        )
+        parser.add_argument(
+            '--compare', metavar='PATH',
+            help='Сравнить с сохранёнными результатами.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост p95 относительно базовой линии.'
+        )
+
+    def handle(self, *args, **options):
+        if options['reviews_per_title'] > options['users']:
+            raise CommandError(
+                'Отзывов на произведение не может быть больше пользователей.'
+            )
+        self.random = random.Random(options['seed'])
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        with tempfile.TemporaryDirectory() as directory:
+            if connection.vendor == 'sqlite':
+                connection.settings_dict['TEST']['NAME'] = str(
+                    Path(directory) / 'benchmark.sqlite3'
+                )
+            creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                self.seed(options)
+                # Ограничение частоты (api.throttling) меряет не
+                # обработчик, а лимиты: без отключения почти все запросы
+                # auth-token стали бы ответами 429.
+                # Письма регистрации остаются в очереди: запрос отправки
+                # не ждёт, а фоновый отправщик конкурировал бы с замером
+                # за базу и слал бы письма в EMAIL_FILE_PATH.
+                with override_settings(REST_FRAMEWORK={
+                    **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}
+                }), mock.patch('core.mail_queue.notify'):
+                    results = self.run_interfaces(options)
+            finally:
+                creation.destroy_test_db(old_name, verbosity=0)
+        self.report(results)
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def run_interfaces(self, options):
+        results = {}
+        if options['interface'] in ('wsgi', 'both'):
+            results.update(self.run_scenarios(options, 'wsgi'))
+        if options['interface'] in ('asgi', 'both'):
+            with override_settings(ROOT_URLCONF=ASGI_URLCONF):
+                results.update(self.run_scenarios(options, 'asgi'))
+        return results
+
+    def seed(self, options):
+        User.objects.bulk_create(
+            User(username=f'user{i}', email=f'user{i}@yamdb.fake')
+            for i in range(options['users'])
+        )
+        self.users = list(User.objects.order_by('id'))
+        self.token_users = itertools.count()
+        self.created = itertools.count()
+        self.admin = User.objects.create_user(
+            username='benchmark_admin', email='admin@yamdb.fake', role=ADMIN
+        )
+        Category.objects.bulk_create(
+            Category(name=f'Категория {i}', slug=f'category-{i}')
+            for i in range(options['categories'])
+        )
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(options['genres'])
+        )
+        self.categories = categories = list(Category.objects.all())
+        self.genres = list(Genre.objects.all())
+        Title.objects.bulk_create(
+            (
+                Title(
+                    name=f'Произведение {i}',
+                    year=self.random.randint(1900, 2020),
+                    description=f'Описание произведения {i}',
+                    category=self.random.choice(categories)
+                )
+                for i in range(options['titles'])
+            ),
+            batch_size=BATCH_SIZE
+        )
+        self.titles = list(Title.objects.values_list('id', flat=True))
+        through = Title.genre.through
+        through.objects.bulk_create(
+            (
+                through(title_id=title_id, genre_id=genre.id)
+                for title_id in self.titles
+                for genre in self.random.sample(
+                    self.genres, min(2, len(self.genres)))
+            ),
+            batch_size=BATCH_SIZE
+        )
+        Review.objects.bulk_create(
+            (
+                Review(
+                    title_id=title_id, author=author,
+                    text=f'Отзыв {author.username} о {title_id}',
+                    score=self.random.randint(1, 10)
+                )
+                for title_id in self.titles
+                for author in self.random.sample(
+                    self.users, options['reviews_per_title'])
+            ),
+            batch_size=BATCH_SIZE
+        )
+        self.reviews = list(Review.objects.values_list('title_id', 'id'))
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    review_id=review_id,
+                    author=self.random.choice(self.users),
+                    text=f'Комментарий {i} к отзыву {review_id}'
+                )
+                for _, review_id in self.reviews
+                for i in range(options['comments_per_review'])
+            ),
+            batch_size=BATCH_SIZE
+        )
+        self.comments = list(Comment.objects.values_list(
+            'review__title_id', 'review_id', 'id'
+        ))
+        call_command('rebuild_ratings', stdout=self.stdout)
+        call_command('rebuild_comment_counts', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+
+    def get_scenarios(self):
+        """Сценарии: имя -> функция, возвращающая (метод, путь, данные)."""
+        choice = self.random.choice
+
+        def comment_path():
+            title_id, review_id, comment_id = choice(self.comments)
+            return (f'{API}/titles/{title_id}/reviews/{review_id}/'
+                    f'comments/{comment_id}/')
+
+        def review_path():
+            title_id, review_id = choice(self.reviews)
+            return f'{API}/titles/{title_id}/reviews/{review_id}/'
+
+        def token_request():
+            # Код одноразовый: каждому запросу свой пользователь и код.
+            number = next(self.token_users)
+            user = User.objects.create_user(
+                username=f'token{number}', email=f'token{number}@yamdb.fake'
+            )
+            return ('post', f'{API}/auth/token/', {
+                'username': user.username,
+                'confirmation_code': confirmation_codes.issue(
+                    user, created=True
+                ),
+            })
+
+        # Сценарии записи готовят свой объект заранее, до замера:
+        # отзыв можно оставить на произведение один раз, а удалить
+        # комментарий — тоже один раз.
+        def review_create():
+            title = Title.objects.create(
+                name=f'Новое произведение {next(self.created)}', year=2000,
+                category=choice(self.categories)
+            )
+            return ('post', f'{API}/titles/{title.id}/reviews/', {
+                'text': 'Новый отзыв', 'score': self.random.randint(1, 10)
+            })
+
+        def comment_delete():
+            title_id, review_id = choice(self.reviews)
+            comment = Comment.objects.create(
+                review_id=review_id, author=self.admin, text='На удаление'
+            )
+            return ('delete', f'{API}/titles/{title_id}/reviews/'
+                              f'{review_id}/comments/{comment.id}/', None)
+
+        def signup_request():
+            number = next(self.created)
+            return ('post', f'{API}/auth/signup/', {
+                'username': f'signup{number}',
+                'email': f'signup{number}@yamdb.fake',
+            })
+
+        # Не дальше последней страницы, иначе на малых данных будут 404.
+        pages = range(1, min(
+            4, -(-len(self.titles) // settings.REST_FRAMEWORK['PAGE_SIZE'])
+        ) + 1)
+        return {
+            'categories-list': lambda: ('get', f'{API}/categories/', None),
+            'genres-list': lambda: ('get', f'{API}/genres/', None),
+            'titles-list': lambda: (
+                'get', f'{API}/titles/', {'page': choice(pages)}),
+            'titles-list-filtered': lambda: (
+                'get', f'{API}/titles/', {'genre': choice(self.genres).slug}),
+            'titles-detail': lambda: (
+                'get', f'{API}/titles/{choice(self.titles)}/', None),
+            'reviews-list': lambda: (
+                'get', f'{API}/titles/{choice(self.titles)}/reviews/', None),
+            'reviews-detail': lambda: ('get', review_path(), None),
+            'comments-list': lambda: (
+                'get', comment_path().rsplit('/', 2)[0] + '/', None),
+            'comments-detail': lambda: ('get', comment_path(), None),
+            'users-list': lambda: ('get', f'{API}/users/', None),
+            'users-me': lambda: ('get', f'{API}/users/me/', None),
+            'search': lambda: (
+                'get', f'{API}/search/',
+                {'q': f'произведение {choice(self.titles) % 100}'}),
+            'titles-stats': lambda: (
+                'get', f'{API}/titles/{choice(self.titles)}/stats/', None),
+            'auth-signup': signup_request,
+            'auth-token': token_request,
+            'reviews-create': review_create,
+            'reviews-update': lambda: (
+                'patch', review_path(),
+                {'text': 'Исправленный отзыв',
+                 'score': self.random.randint(1, 10)}),
+            'comments-create': lambda: (
+                'post', comment_path().rsplit('/', 2)[0] + '/',
+                {'text': 'Новый комментарий'}),
+            'comments-delete': comment_delete,
+            'titles-bulk-update': lambda: (
+                'patch', f'{API}/titles/bulk/', [
+                    {'id': title_id, 'description': 'Новое описание'}
+                    for title_id in self.random.sample(
+                        self.titles, min(10, len(self.titles)))
+                ]),
+        }
+
+    def run_scenarios(self, options, interface):
+        admin_token = f'Bearer {RoleAccessToken.for_user(self.admin)}'
+        only = {name for name in options['only'].split(',') if name}
+        results = {}
+        for name, make_request in self.get_scenarios().items():
+            if only and name not in only:
+                continue
+            requests = [make_request() for _ in range(options['requests'])]
+            concurrency = options['concurrency']
+            if name in WRITE_SCENARIOS and connection.vendor == 'sqlite':
+                concurrency = 1
+            chunks = [requests[i::concurrency] for i in range(concurrency)]
+            started = time.perf_counter()
+            if interface == 'asgi':
+                measured = asyncio.run(self.run_async(chunks, admin_token))
+                name = f'{name}@asgi'
+            else:
+                with ThreadPoolExecutor(concurrency) as executor:
+                    measured = [
+                        sample
+                        for samples in executor.map(
+                            lambda chunk: self.run_chunk(chunk, admin_token),
+                            chunks
+                        )
+                        for sample in samples
+                    ]
+            elapsed = time.perf_counter() - started
+            results[name] = self.summarize(measured, elapsed)
+        return results
+
+    @staticmethod
+    def build_request(path, method, data):
+        """Путь и аргументы клиента: строка запроса GET собирается в
+        path, тело остальных методов отправляется JSON.
+
+        AsyncClient в Django 3.2 теряет data у GET (QUERY_STRING уходит
+        в заголовки), а multipart-тело POST читает с ошибкой; оба
+        клиента получают одинаковые запросы.
+        """
+        if method == 'get':
+            if data:
+                path = f'{path}?{urlencode(data)}'
+            return path, {}
+        if data is None:
+            return path, {}
+        return path, {
+            'data': json.dumps(data), 'content_type': 'application/json'
+        }
+
+    def run_chunk(self, requests, token):
+        client = Client(HTTP_AUTHORIZATION=token)
+        samples = []
+        try:
+            for method, path, data in requests:
+                path, body = self.build_request(path, method, data)
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = getattr(client, method)(path, **body)
+                    latency = time.perf_counter() - started
+                samples.append(
+                    (latency, len(queries), response.status_code < 400)
+                )
+        finally:
+            connection.close()
+        return samples
+
+    async def run_async(self, chunks, token):
+        """Все запросы обслуживает один цикл событий, как воркер ASGI."""
+        chunks = await asyncio.gather(
+            *(self.run_async_chunk(chunk, token) for chunk in chunks)
+        )
+        return [sample for samples in chunks for sample in samples]
+
+    async def run_async_chunk(self, requests, token):
+        client = AsyncClient()
+        samples = []
+        for method, path, data in requests:
+            path, body = self.build_request(path, method, data)
+            started = time.perf_counter()
+            response = await getattr(client, method)(
+                path, AUTHORIZATION=token, **body
+            )
+            latency = time.perf_counter() - started
+            # ORM работает в потоках пула, поэтому запросы считает
+            # middleware метрик, а не CaptureQueriesContext.
+            queries = SERVER_TIMING_QUERIES.search(
+                response.get('Server-Timing', '')
+            )
+            samples.append((
+                latency, int(queries[1]) if queries else 0,
+                response.status_code < 400
+            ))
+        return samples
+
+    def summarize(self, samples, elapsed):
+        latencies = [latency * 1000 for latency, _, _ in samples]
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            'p50': round(percentiles[49], 3),
+            'p95': round(percentiles[94], 3),
+            'p99': round(percentiles[98], 3),
+            'rps': round(len(samples) / elapsed, 1),
+            'queries': round(
+                statistics.mean(queries for _, queries, _ in samples), 2
+            ),
+            'max_queries': max(queries for _, queries, _ in samples),
+            'errors': sum(1 for _, _, ok in samples if not ok),
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"сценарий":<27}{"p50 мс":>9}{"p95 мс":>9}{"p99 мс":>9}'
+            f'{"rps":>9}{"SQL":>7}{"ошибки":>8}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<27}{result["p50"]:>9.2f}{result["p95"]:>9.2f}'
+                f'{result["p99"]:>9.2f}{result["rps"]:>9.1f}'
+                f'{result["queries"]:>7.1f}{result["errors"]:>8}'
+            )
+
+    def compare(self, results, path, tolerance):
+        with open(path) as file:
+            baseline = json.load(file)
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            if result['p95'] > base['p95'] * (1 + tolerance):
+                regressions.append(
+                    f'{name}: p95 {base["p95"]} -> {result["p95"]} мс'
+                )
+            # Среднее зависит от попаданий в кэш, максимум — нет.
+            if result['max_queries'] > base['max_queries']:
+                regressions.append(
+                    f'{name}: SQL {base["max_queries"]} -> '
+                    f'{result["max_queries"]}'
+                )
+            if result['errors'] > base['errors']:
+                regressions.append(
+                    f'{name}: ошибки {base["errors"]} -> {result["errors"]}'
+                )
+        if regressions:
+            raise CommandError(
+                'Регрессии относительно базовой линии:\n'
+                + '\n'.join(regressions)
+            )
+        self.stdout.write('Регрессий относительно базовой линии нет.')
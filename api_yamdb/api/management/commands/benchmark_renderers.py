@@ -0,0 +1,89 @@
+import statistics
+import time
+from unittest import mock
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.row_serializers import TitleRowSerializer
+from api.serializers import UserSerializer
+from api.views import TitleViewSet
+from reviews.models import Category, Genre, Title, User
+
+REPEAT = 30
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравниваем время рендеринга страниц произведений и пользователей '
+        'JSONRenderer DRF и FastJSONRenderer. Данные откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-sizes', default='5,100,1000',
+            help='Размеры страниц через запятую.'
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['page_sizes'].split(','))
+        with transaction.atomic():
+            self.seed(sizes[-1])
+            for size in sizes:
+                titles = TitleRowSerializer(TitleRowSerializer.get_values(
+                    TitleViewSet.queryset.all())[:size]).data
+                users = UserSerializer(
+                    User.objects.all()[:size], many=True).data
+                for name, results in (('titles', titles), ('users', users)):
+                    self.report(name, size, {
+                        'count': len(results), 'next': None,
+                        'previous': None, 'results': results,
+                    })
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        category = Category.objects.create(name='Категория', slug='bench')
+        genre = Genre.objects.create(name='Жанр', slug='bench')
+        Title.objects.bulk_create(
+            Title(
+                name=f'Произведение {i}', year=2000, category=category,
+                description='Описание произведения ' * 5
+            )
+            for i in range(count)
+        )
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title_id, genre_id=genre.id)
+            for title_id in Title.objects.filter(
+                category=category).values_list('id', flat=True)
+        )
+        User.objects.bulk_create(
+            User(
+                username=f'bench{i}', email=f'bench{i}@yamdb.fake',
+                first_name='Имя', last_name='Фамилия', bio='О себе ' * 10
+            )
+            for i in range(count)
+        )
+
+    def report(self, name, size, data):
+        fast = renderers.FastJSONRenderer()
+        timings = {
+            'drf': self.measure(lambda: JSONRenderer().render(data)),
+            'fast': self.measure(lambda: fast.render(data)),
+            'stream': self.measure(
+                lambda: b''.join(fast.iter_render(data))),
+        }
+        with mock.patch.object(renderers, 'orjson', None):
+            timings['fast-json'] = self.measure(lambda: fast.render(data))
+        self.stdout.write(f'{name:<7}{size:>6} ' + ', '.join(
+            f'{key} {value * 1000:.3f} мс' for key, value in timings.items()
+        ))
+
+    def measure(self, render):
+        timings = []
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
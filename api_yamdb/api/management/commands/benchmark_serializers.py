@@ -0,0 +1,91 @@
+import random
+import statistics
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.row_serializers import (CommentRowSerializer, ReviewRowSerializer,
+                                 TitleRowSerializer)
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleGetSerializer)
+from api.views import TitleViewSet
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+REPEAT = 50
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравниваем процессорное время на страницу списка у ModelSerializer '
+        'и сериализаторов строк values(). Данные откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        self.random = random.Random(options['seed'])
+        with transaction.atomic():
+            self.seed(page_size)
+            cases = (
+                ('titles', TitleViewSet.queryset.all(),
+                 TitleGetSerializer, TitleRowSerializer),
+                ('reviews', Review.objects.select_related('author'),
+                 ReviewSerializer, ReviewRowSerializer),
+                ('comments', Comment.objects.select_related('author'),
+                 CommentSerializer, CommentRowSerializer),
+            )
+            for name, queryset, serializer_class, row_serializer in cases:
+                queryset = queryset.order_by('id')
+                model = self.measure(lambda: serializer_class(
+                    queryset[:page_size], many=True).data)
+                rows = self.measure(lambda: row_serializer(
+                    row_serializer.get_values(queryset)[:page_size]).data)
+                self.stdout.write(
+                    f'{name:<9} ModelSerializer {model * 1000:8.2f} мс, '
+                    f'values() {rows * 1000:8.2f} мс, '
+                    f'x{model / rows:.1f}'
+                )
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        category = Category.objects.create(name='Категория', slug='bench')
+        genres = Genre.objects.bulk_create(
+            Genre(name=f'Жанр {i}', slug=f'bench-{i}') for i in range(5)
+        )
+        genres = list(Genre.objects.filter(
+            slug__in=[genre.slug for genre in genres]))
+        users = [
+            User.objects.create(
+                username=f'bench{i}', email=f'bench{i}@yamdb.fake')
+            for i in range(count)
+        ]
+        titles = [
+            Title.objects.create(
+                name=f'Бенчмарк {i}', year=2000, category=category)
+            for i in range(count)
+        ]
+        for title in titles:
+            title.genre.set(self.random.sample(genres, 2))
+        Review.objects.bulk_create(
+            Review(title=titles[0], author=user, text='Отзыв', score=5)
+            for user in users
+        )
+        review = Review.objects.filter(title=titles[0]).first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text='Комментарий')
+            for user in users
+        )
+
+    def measure(self, serialize):
+        """Медиана процессорного времени на выборку, сериализацию и JSON."""
+        timings = []
+        for _ in range(REPEAT):
+            started = time.process_time()
+            JSONRenderer().render(serialize())
+            timings.append(time.process_time() - started)
+        return statistics.median(timings)
@@ -0,0 +1,65 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import BaseCommand
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.throttling import IPTokenBucketThrottle, UserTokenBucketThrottle
+from api.views import CommentViewSet, RegisterView
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряем накладные расходы проверки TokenBucketThrottle на '
+        'запрос без обращения к сети и БД.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100000)
+        parser.add_argument('--clients', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=4)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        requests = []
+        for i in range(options['clients']):
+            request = Request(
+                factory.post(
+                    '/api/v1/auth/signup/', {'username': f'user{i}'},
+                    REMOTE_ADDR=f'10.{i // 65536}.{i // 256 % 256}.{i % 256}'
+                ),
+                parsers=[FormParser(), MultiPartParser()]
+            )
+            request.user = AnonymousUser()
+            requests.append(request)
+        views = (('auth', RegisterView()), ('comments', CommentViewSet()))
+        for name, view in views:
+            for throttle_class in (
+                    IPTokenBucketThrottle, UserTokenBucketThrottle):
+                self.report(
+                    f'{name}/{throttle_class.kind}', throttle_class, view,
+                    requests, options
+                )
+
+    def report(self, name, throttle_class, view, requests, options):
+        per_thread = options['requests'] // options['concurrency']
+
+        def run(offset):
+            throttle = throttle_class()
+            started = time.perf_counter()
+            for i in range(per_thread):
+                throttle.allow_request(
+                    requests[(offset + i) % len(requests)], view
+                )
+            return (time.perf_counter() - started) / per_thread
+
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            timings = list(executor.map(run, range(options['concurrency'])))
+        self.stdout.write(
+            f'{name:<15} {statistics.mean(timings) * 1e6:8.2f} мкс '
+            f'на проверку ({options["concurrency"]} потоков)'
+        )
@@ -0,0 +1,114 @@
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management import BaseCommand
+from django.db import connection
+
+from api.filters import TitleFilter
+from api.views import TitleViewSet
+from reviews.models import Category, Genre, Title
+
+BATCH_SIZE = 5000
+PAGE_SIZE = 10
+REPEAT = 20
+
+FILTERS = (
+    ('ordering', {}),
+    ('year', {'year': '1999'}),
+    ('category', {'category': 'category-3'}),
+    ('genre', {'genre': 'genre-7'}),
+    ('category+year', {'category': 'category-3', 'year': '1999'}),
+    ('name', {'name': 'title 4242'}),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряем время фильтрации произведений на синтетическом каталоге. '
+        'Данные создаются во временной тестовой базе, рабочая база не '
+        'затрагивается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales', default='1000,10000,100000',
+            help='Размеры каталога через запятую, например 1000,1000000.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        scales = sorted(int(scale) for scale in options['scales'].split(','))
+        self.random = random.Random(options['seed'])
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        with tempfile.TemporaryDirectory() as directory:
+            if connection.vendor == 'sqlite':
+                connection.settings_dict['TEST']['NAME'] = str(
+                    Path(directory) / 'benchmark.sqlite3'
+                )
+            creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                categories, genres = self.seed_dictionaries()
+                seeded = 0
+                for scale in scales:
+                    self.seed_titles(seeded, scale, categories, genres)
+                    seeded = scale
+                    self.report(scale)
+            finally:
+                creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed_dictionaries(self):
+        categories = Category.objects.bulk_create(
+            Category(name=f'Category {i}', slug=f'category-{i}')
+            for i in range(10)
+        )
+        genres = Genre.objects.bulk_create(
+            Genre(name=f'Genre {i}', slug=f'genre-{i}') for i in range(20)
+        )
+        return (
+            list(Category.objects.filter(
+                slug__in=[category.slug for category in categories])),
+            list(Genre.objects.filter(
+                slug__in=[genre.slug for genre in genres])),
+        )
+
+    def seed_titles(self, start, stop, categories, genres):
+        through = Title.genre.through
+        for offset in range(start, stop, BATCH_SIZE):
+            numbers = range(offset, min(offset + BATCH_SIZE, stop))
+            Title.objects.bulk_create(
+                Title(
+                    name=f'Title {number}',
+                    year=self.random.randint(1900, 2020),
+                    category=self.random.choice(categories)
+                )
+                for number in numbers
+            )
+            titles = Title.objects.filter(
+                name__in=[f'Title {number}' for number in numbers]
+            ).values_list('id', flat=True)
+            through.objects.bulk_create(
+                through(title_id=title_id, genre_id=genre.id)
+                for title_id in titles
+                for genre in self.random.sample(
+                    genres, self.random.randint(1, 3))
+            )
+
+    def report(self, scale):
+        for name, data in FILTERS:
+            timings = []
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                queryset = TitleFilter(
+                    data, queryset=TitleViewSet.queryset.all()
+                ).qs
+                queryset.count()
+                list(queryset[:PAGE_SIZE])
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(
+                f'{scale:>9} {name:<14} '
+                f'медиана {statistics.median(timings) * 1000:8.2f} мс'
+            )
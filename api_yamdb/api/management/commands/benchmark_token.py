@@ -0,0 +1,67 @@
+import statistics
+import time
+
+from django.contrib.auth import authenticate
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import TokenSerializer
+from api.views import TokenView
+from core import confirmation_codes
+from reviews.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряем пропускную способность /auth/token/ без сети и '
+        'ограничений частоты. Пользователи создаются внутри транзакции '
+        'и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--users', type=int, default=100)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            User.objects.bulk_create(
+                User(username=f'token{i}', email=f'token{i}@yamdb.fake')
+                for i in range(options['users'])
+            )
+            users = list(User.objects.filter(username__startswith='token'))
+            codes = [
+                (user.username, confirmation_codes.issue(user, created=True))
+                for user in users
+            ]
+            requests = [
+                codes[i % len(codes)] for i in range(options['requests'])
+            ]
+            self.report('поиск: authenticate()', requests, lambda data:
+                        authenticate(username=data[0]))
+            self.report('поиск: один SELECT', requests, lambda data:
+                        User.objects.filter(username=data[0]).only(
+                            *TokenSerializer.token_fields).first())
+            view = TokenView.as_view(throttle_classes=[])
+            factory = APIRequestFactory()
+            self.report('POST /auth/token/', requests, lambda data: view(
+                factory.post('/api/v1/auth/token/', {
+                    'username': data[0], 'confirmation_code': data[1]
+                })
+            ))
+            transaction.set_rollback(True)
+
+    def report(self, name, requests, run):
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for data in requests:
+                started = time.perf_counter()
+                run(data)
+                timings.append(time.perf_counter() - started)
+        total = sum(timings)
+        self.stdout.write(
+            f'{name:<24} {len(requests) / total:9.0f} запросов/с, '
+            f'медиана {statistics.median(timings) * 1e6:8.1f} мкс, '
+            f'SQL {len(queries) / len(requests):.1f} на запрос'
+        )
@@ -1,34 +1,180 @@
 import csv
+import time
+from contextlib import contextmanager
 
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand, call_command
+from django.core.management.color import no_style
+from django.db import connection, transaction
 
-from ....reviews.models import (Category, Comment, Genre, GenreTitle, Review,
-                                Title, User)
+from reviews.models import Category, Comment, Genre, Review, Title, User
 
-CSV_LIST_DICT = {
-    Category: 'category.csv',
-    Comment: 'comments.csv',
-    GenreTitle: 'genre_title.csv',
-    Genre: 'genre.csv',
-    Review: 'review.csv',
-    Title: 'titles.csv',
-    User: 'users.csv'
-}
+BATCH_SIZE = 1000
+
+# Порядок важен: модель загружается только после тех, на кого ссылается.
+# (модель, файл, обычные колонки, колонки-ссылки {колонка: (поле, модель)},
+#  поля уникальности).
+CSV_FILES = (
+    (User, 'users.csv',
+     ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+     {}, (('username',), ('email',))),
+    (Category, 'category.csv', ('id', 'name', 'slug'), {}, (('slug',),)),
+    (Genre, 'genre.csv', ('id', 'name', 'slug'), {}, (('slug',),)),
+    (Title, 'titles.csv', ('id', 'name', 'year'),
+     {'category': ('category_id', Category)}, (('name', 'year'),)),
+    (Title.genre.through, 'genre_title.csv', ('id',),
+     {'title_id': ('title_id', Title), 'genre_id': ('genre_id', Genre)},
+     (('title_id', 'genre_id'),)),
+    (Review, 'review.csv', ('id', 'text', 'score', 'pub_date'),
+     {'title_id': ('title_id', Title), 'author': ('author_id', User)},
+     (('title_id', 'author_id'),)),
+    (Comment, 'comments.csv', ('id', 'text', 'pub_date'),
+     {'review_id': ('review_id', Review), 'author': ('author_id', User)},
+     ()),
+)
+
+# Поля, уникальные без учёта регистра (индексы по LOWER(), миграция 0013).
+CASE_INSENSITIVE = {(User, 'username'), (User, 'email')}
+
+
+def unique_key(model, fields, values):
+    return tuple(
+        values[field].lower() if (model, field) in CASE_INSENSITIVE
+        else values[field]
+        for field in fields
+    )
+
+
+@contextmanager
+def keep_auto_now_add(*models):
+    """Сохраняет даты из файлов вместо текущего времени."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
 
 
 class Command(BaseCommand):
     help = 'Выгружаем данные из csv-файлов.'
 
-    def handle(self, *args, **kwargs):
-        for model, file in CSV_LIST_DICT.items():
-            with open(
-                f'{settings.BASE_DIR}/static/data/{file}', 'r',
-                encoding='utf-8'
-            ) as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    try:
-                        model.objects.create(**row)
-                    except Exception as e:
-                        print(f'Ошибочка вышла: {e}.')
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--path', default=settings.BASE_DIR / 'static' / 'data',
+            help='Каталог с csv-файлами.'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+        self.known_ids = {}
+        models = [model for model, *_ in CSV_FILES]
+        with transaction.atomic(), keep_auto_now_add(*models):
+            for model, file, columns, foreign_keys, unique in CSV_FILES:
+                self.load(
+                    model, f'{options["path"]}/{file}',
+                    columns, foreign_keys, unique
+                )
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                        no_style(), models):
+                    cursor.execute(sql)
+        call_command('rebuild_ratings', stdout=self.stdout)
+        call_command('rebuild_comment_counts', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+
+    def load(self, model, path, columns, foreign_keys, unique):
+        opts = model._meta
+        known_ids = self.known_ids[model] = set(
+            model.objects.values_list('pk', flat=True)
+        )
+        seen = {
+            fields: {
+                unique_key(model, fields, values)
+                for values in model.objects.values(*fields)
+            }
+            for fields in unique
+        }
+        loaded = rejected = 0
+        batch = []
+        started = time.monotonic()
+        with open(path, 'r', encoding='utf-8', newline='') as csvfile:
+            reader = csv.DictReader(csvfile)
+            for row in reader:
+                try:
+                    values = self.parse_row(
+                        opts, row, columns, foreign_keys
+                    )
+                    keys = self.check_unique(
+                        model, values, known_ids, seen
+                    )
+                except ValidationError as error:
+                    rejected += 1
+                    if self.verbosity > 1:
+                        self.stderr.write(
+                            f'{path}:{reader.line_num}: '
+                            f'{"; ".join(error.messages)}'
+                        )
+                    continue
+                known_ids.add(values['id'])
+                for fields, key in keys.items():
+                    seen[fields].add(key)
+                batch.append(model(**values))
+                if len(batch) >= self.batch_size:
+                    model.objects.bulk_create(batch)
+                    loaded += len(batch)
+                    batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+            loaded += len(batch)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{opts.db_table}: загружено {loaded}, отклонено {rejected}, '
+            f'{loaded / elapsed if elapsed else loaded:.0f} строк/с.'
+        )
+
+    def check_unique(self, model, values, known_ids, seen):
+        if values['id'] in known_ids:
+            raise ValidationError(f'id {values["id"]} уже существует')
+        keys = {
+            fields: unique_key(model, fields, values) for fields in seen
+        }
+        for fields, key in keys.items():
+            if key in seen[fields]:
+                raise ValidationError(
+                    f'{", ".join(fields)} {key} уже существует'
+                )
+        return keys
+
+    def parse_row(self, opts, row, columns, foreign_keys):
+        values = {}
+        missing = set(columns).union(foreign_keys).difference(row)
+        if missing:
+            raise ValidationError(f'нет колонок {", ".join(sorted(missing))}')
+        for column in columns:
+            field = opts.get_field(column)
+            values[field.attname] = field.clean(row[column], None)
+        for column, (attname, related_model) in foreign_keys.items():
+            value = row[column]
+            if not value and opts.get_field(attname).null:
+                values[attname] = None
+                continue
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValidationError(f'{column}: некорректный id {value!r}')
+            if value not in self.known_ids[related_model]:
+                raise ValidationError(f'{column}: объект {value} не найден')
+            values[attname] = value
+        return values
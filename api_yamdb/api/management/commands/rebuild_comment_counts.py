@@ -0,0 +1,22 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from reviews.models import Comment, Review
+
+
+class Command(BaseCommand):
+    help = 'Исправляем расхождения счётчиков комментариев у отзывов.'
+
+    @transaction.atomic
+    def handle(self, *args, **kwargs):
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')).order_by().values('review')
+        actual = Coalesce(Subquery(
+            comments.annotate(total=Count('id')).values('total')), 0)
+        drifted = Review.objects.annotate(actual=actual).exclude(
+            comments_count=F('actual'))
+        updated = Review.objects.filter(
+            pk__in=drifted.values('pk')).update(comments_count=actual)
+        self.stdout.write(f'Исправлено счётчиков комментариев: {updated}.')
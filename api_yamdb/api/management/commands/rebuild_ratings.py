@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.models import Review, Title, TitleStats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитываем рейтинги, гистограммы оценок и даты последних '
+        'отзывов произведений по отзывам.'
+    )
+
+    @transaction.atomic
+    def handle(self, *args, **kwargs):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        updated = Title.objects.update(
+            rating_sum=Coalesce(Subquery(
+                reviews.annotate(total=Sum('score')).values('total')), 0),
+            rating_count=Coalesce(Subquery(
+                reviews.annotate(total=Count('id')).values('total')), 0),
+        )
+        self.stdout.write(f'Пересчитано произведений: {updated}.')
+        stats = TitleStats.rebuild()
+        self.stdout.write(f'Пересчитана статистика произведений: {stats}.')
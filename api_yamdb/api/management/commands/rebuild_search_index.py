@@ -0,0 +1,35 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews.models import Comment, Review, SearchEntry, Title
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Перестраиваем полнотекстовый индекс произведений и отзывов.'
+
+    @transaction.atomic
+    def handle(self, *args, **kwargs):
+        SearchEntry.objects.all().delete()
+        sources = (
+            (Title.objects.only('id', 'name', 'description'),
+             SearchEntry.for_title),
+            (Review.objects.only('id', 'title_id', 'text'),
+             SearchEntry.for_review),
+            (Comment.objects.select_related('review').only(
+                'id', 'review_id', 'review__title_id', 'text'),
+             SearchEntry.for_comment),
+        )
+        total = 0
+        for queryset, make_entry in sources:
+            batch = []
+            for obj in queryset.iterator(chunk_size=BATCH_SIZE):
+                batch.append(make_entry(obj))
+                if len(batch) >= BATCH_SIZE:
+                    SearchEntry.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            SearchEntry.objects.bulk_create(batch)
+            total += len(batch)
+        self.stdout.write(f'Проиндексировано записей: {total}.')
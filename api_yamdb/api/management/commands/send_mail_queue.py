@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from core.mail_queue import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляем письма из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить накопившиеся письма и завершиться.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.MAIL_QUEUE_BATCH_SIZE,
+            help='Количество писем на одно соединение с почтовым сервером.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = deliver_pending(options['batch_size'])
+            if processed:
+                self.stdout.write(f'Обработано писем: {processed}.')
+                continue
+            if options['once']:
+                return
+            time.sleep(settings.MAIL_QUEUE_POLL_INTERVAL)
@@ -0,0 +1,10 @@
+from django.core.management import BaseCommand
+
+from core.confirmation_codes import sweep
+
+
+class Command(BaseCommand):
+    help = 'Удаляем просроченные коды подтверждения.'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write(f'Удалено просроченных кодов: {sweep()}.')
@@ -1,8 +1,277 @@
-from rest_framework import mixins, viewsets
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from core.middleware import timed_serialization
+from . import cache
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .serializers import BulkListSerializer
+
+
+class TimedListMixin(mixins.ListModelMixin):
+    """list с учётом времени serializer.data в Server-Timing (фаза
+    serialize) и метриках."""
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(
+            queryset if page is None else page, many=True
+        )
+        with timed_serialization(request):
+            data = serializer.data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class TimedRetrieveMixin(mixins.RetrieveModelMixin):
+    """retrieve с учётом времени serializer.data, как TimedListMixin."""
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        with timed_serialization(request):
+            data = serializer.data
+        return Response(data)
 
 
 class CDLViewSet(mixins.CreateModelMixin,
                  mixins.DestroyModelMixin,
-                 mixins.ListModelMixin,
+                 TimedListMixin,
                  viewsets.GenericViewSet):
     ...
+
+
+class CachedListMixin:
+    """Кэширует ответы list по пути и параметрам запроса.
+
+    Записи сбрасываются сигналами из api.signals при изменении моделей
+    раздела `cache_namespace`; совпадение If-None-Match с ETag
+    записи возвращает 304 без обращения к БД.
+    """
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        key = cache.make_key(self.cache_namespace, request)
+        cached = cache.get_cache().get(key)
+        if cached is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cached = (cache.make_etag(response.data), response.data)
+            cache.get_cache().set(
+                key, cached, settings.CATALOG_CACHE_TIMEOUT
+            )
+        etag, data = cached
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (
+            etag in parse_etags(if_none_match) or if_none_match == '*'
+        ):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        return Response(data, headers={'ETag': etag})
+
+
+class RowListMixin(TimedRetrieveMixin):
+    """Отдаёт list через values() и row_serializer_class.
+
+    Остальные действия по-прежнему используют serializer_class; время
+    сериализации list и retrieve учитывается, как в TimedListMixin.
+    """
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.row_serializer_class
+        queryset = serializer_class.get_values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        with timed_serialization(request):
+            data = serializer_class(
+                queryset if page is None else page
+            ).data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class FastJSONMixin:
+    """Подключает FastJSONRenderer и FastJSONParser к представлению.
+
+    Большие списки (длиннее FAST_JSON_STREAM_THRESHOLD) отдаются
+    StreamingHttpResponse, не собирая весь ответ в одну строку. Страницы
+    списков при PAGE_SIZE по умолчанию порога не достигают; потоком
+    уходят ответы пакетного PATCH и страницы с увеличенным PAGE_SIZE.
+    """
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+    parser_classes = (FastJSONParser, FormParser, MultiPartParser)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        renderer = getattr(response, 'accepted_renderer', None)
+        if not (
+            isinstance(renderer, FastJSONRenderer)
+            and response.status_code == status.HTTP_200_OK
+            and self.is_large(
+                response.data, renderer.get_stream_threshold()
+            )
+        ):
+            return response
+        streaming = StreamingHttpResponse(
+            renderer.iter_render(response.data),
+            content_type=f'{response.accepted_media_type}; charset=utf-8'
+        )
+        for header, value in response.items():
+            if header.lower() != 'content-type':
+                streaming[header] = value
+        return streaming
+
+    @staticmethod
+    def is_large(data, threshold):
+        if isinstance(data, dict):
+            data = data.get('results')
+        return isinstance(data, list) and len(data) > threshold
+
+
+class BulkMixin:
+    """Пакетные POST, PATCH и DELETE на `{prefix}/bulk/`.
+
+    POST принимает список объектов, PATCH — список объектов с полем
+    lookup_field (`id` для pk), DELETE — список значений lookup_field.
+    Весь пакет пишется в одной транзакции: либо все объекты, либо ничего.
+    bulk_create и bulk_update не отправляют сигналов, поэтому кэш и
+    поисковый индекс обновляют perform_bulk_create и perform_bulk_update.
+    """
+    bulk_max_size = 1000
+    bulk_cache_namespaces = ()
+
+    @property
+    def bulk_lookup_key(self):
+        return 'id' if self.lookup_field == 'pk' else self.lookup_field
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        kwargs['context'] = self.get_serializer_context()
+        child = self.get_serializer_class()(
+            context=kwargs['context'], partial=kwargs.get('partial', False)
+        )
+        return BulkListSerializer(*args, child=child, **kwargs)
+
+    def get_bulk_data(self, request):
+        data = request.data
+        if not isinstance(data, list) or not data:
+            raise serializers.ValidationError(
+                'Ожидается непустой список объектов.'
+            )
+        if len(data) > self.bulk_max_size:
+            raise serializers.ValidationError(
+                f'В одном запросе не больше {self.bulk_max_size} объектов.'
+            )
+        return data
+
+    def get_bulk_objects(self, values):
+        """Объекты по значениям lookup_field одним запросом, в том же
+        порядке; повторы — 400 со списком ошибок по индексам,
+        отсутствующие — 404."""
+        queryset = self.get_queryset()
+        opts = queryset.model._meta
+        field = (
+            opts.pk if self.lookup_field == 'pk'
+            else opts.get_field(self.lookup_field)
+        )
+        try:
+            values = [field.to_python(value) for value in values]
+        except Exception:
+            raise serializers.ValidationError(
+                f'Некорректные значения {self.bulk_lookup_key}.'
+            )
+        seen = set()
+        errors = []
+        for value in values:
+            errors.append(
+                {self.bulk_lookup_key: ['Значение повторяется в пакете.']}
+                if value in seen else {}
+            )
+            seen.add(value)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        found = queryset.in_bulk(values, field_name=self.lookup_field)
+        missing = [value for value in values if value not in found]
+        if missing:
+            raise NotFound(
+                f'Не найдены: {", ".join(map(str, missing))}.'
+            )
+        return [found[value] for value in values]
+
+    @action(detail=False, methods=['post', 'patch', 'delete'],
+            url_path='bulk', url_name='bulk')
+    def bulk(self, request):
+        data = self.get_bulk_data(request)
+        with transaction.atomic():
+            if request.method == 'DELETE':
+                self.perform_bulk_destroy(self.get_bulk_objects(data))
+                return Response(status=status.HTTP_204_NO_CONTENT)
+            if request.method == 'POST':
+                serializer = self.get_bulk_serializer(data=data)
+                serializer.is_valid(raise_exception=True)
+                self.perform_bulk_create(serializer)
+                response_status = status.HTTP_201_CREATED
+            else:
+                if not all(isinstance(item, dict) and self.bulk_lookup_key
+                           in item for item in data):
+                    raise serializers.ValidationError(
+                        f'У каждого объекта должно быть поле '
+                        f'{self.bulk_lookup_key}.'
+                    )
+                instances = self.get_bulk_objects(
+                    [item[self.bulk_lookup_key] for item in data]
+                )
+                serializer = self.get_bulk_serializer(
+                    instances, data=data, partial=True
+                )
+                serializer.is_valid(raise_exception=True)
+                self.perform_bulk_update(serializer)
+                response_status = status.HTTP_200_OK
+        instances = serializer.instance
+        for instance in instances:
+            instance.__dict__.pop('_prefetched_objects_cache', None)
+        prefetch_related_objects(instances, *(
+            field.name for field in serializer.model._meta.many_to_many
+        ))
+        return Response(serializer.data, status=response_status)
+
+    def perform_bulk_create(self, serializer):
+        serializer.save()
+        cache.invalidate(*self.bulk_cache_namespaces)
+
+    def perform_bulk_update(self, serializer):
+        serializer.save()
+        cache.invalidate(*self.bulk_cache_namespaces)
+
+    def perform_bulk_destroy(self, instances):
+        # delete() по QuerySet отправляет post_delete для каждого объекта,
+        # так что кэш и поисковый индекс чистят обычные сигналы.
+        type(instances[0]).objects.filter(
+            pk__in=[instance.pk for instance in instances]
+        ).delete()
+
+
+class ActionThrottleMixin:
+    """Применяет throttle_classes только к действиям throttled_actions."""
+    throttled_actions = ('create',)
+
+    def get_throttles(self):
+        if self.action not in self.throttled_actions:
+            return []
+        return super().get_throttles()
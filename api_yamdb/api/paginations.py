@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 
@@ -12,3 +12,36 @@ class CategoryPagination(PageNumberPagination):
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
         })
+
+
+class PubDateCursorPagination(CursorPagination):
+    ordering = ('pub_date', 'id')
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """Постраничная пагинация с переходом на курсорную по запросу.
+
+    Курсорный режим включается параметром `?pagination=cursor` (ссылки
+    `next`/`previous` содержат `cursor` и остаются в нём) и не выполняет
+    ни COUNT(*), ни OFFSET, поэтому глубокие страницы не дороже первой.
+    """
+    mode_query_param = 'pagination'
+    cursor_pagination_class = PubDateCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        ):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,34 +1,70 @@
+from collections import namedtuple
+
 from rest_framework import permissions
 
 from reviews.constants import ADMIN, MODERATOR
 
 
+class Access(namedtuple('Access', 'user_id role is_superuser')):
+    """Роль и флаги пользователя, нужные для проверки прав."""
+
+    @property
+    def is_authenticated(self):
+        return self.user_id is not None
+
+    @property
+    def is_admin(self):
+        return self.role == ADMIN
+
+    @property
+    def can_moderate(self):
+        return self.is_superuser or self.role in (ADMIN, MODERATOR)
+
+
+ANONYMOUS = Access(None, None, False)
+
+
+def get_access(request):
+    """Возвращает Access пользователя, вычисленный один раз за запрос.
+
+    Результат сохраняется на запросе и общий для всех классов
+    разрешений, в том числе объединённых через | и &.
+    """
+    access = getattr(request, '_access', None)
+    if access is None:
+        user = request.user
+        if user.is_authenticated:
+            access = Access(user.pk, user.role, user.is_superuser)
+        else:
+            access = ANONYMOUS
+        request._access = access
+    return access
+
+
 class IsAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
-        if request.user.is_authenticated:
-            return request.user.role == ADMIN
-        return False
+        return get_access(request).is_admin
 
 
 class IsAdminUserOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
-        if request.method in permissions.SAFE_METHODS:
-            return True
-        elif request.user.is_authenticated:
-            return request.user.role == ADMIN
+        return (
+            request.method in permissions.SAFE_METHODS
+            or get_access(request).is_admin
+        )
 
 
 class AuthorOrHasRoleOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
             request.method in permissions.SAFE_METHODS
-            or request.user.is_authenticated
+            or get_access(request).is_authenticated
         )
 
     def has_object_permission(self, request, view, obj):
-        if request.user.is_authenticated:
-            return (request.user.is_superuser
-                    or request.user.role == ADMIN
-                    or request.user.role == MODERATOR
-                    or obj.author == request.user)
+        access = get_access(request)
+        if access.is_authenticated:
+            # author_id, а не author: связанный объект и модель текущего
+            # пользователя не загружаются.
+            return access.can_moderate or obj.author_id == access.user_id
         return request.method in permissions.SAFE_METHODS
@@ -0,0 +1,84 @@
+import json
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Даты, Decimal, UUID и ленивые строки кодируем как JSONEncoder DRF,
+# чтобы ответ не зависел от того, установлен ли orjson.
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if orjson else 0
+)
+
+
+def dumps(data):
+    """Компактный UTF-8 JSON, совпадающий с выводом JSONRenderer DRF."""
+    if orjson is not None:
+        content = orjson.dumps(
+            data, default=JSONEncoder().default, option=ORJSON_OPTIONS
+        )
+    else:
+        content = json.dumps(
+            data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False,
+            separators=(',', ':')
+        ).encode()
+    # Как JSONRenderer: U+2028 и U+2029 допустимы в JSON, но не в
+    # JavaScript, поэтому экранируем их для встраивания ответа в <script>.
+    return content.replace(
+        '\u2028'.encode(), b'\\u2028'
+    ).replace('\u2029'.encode(), b'\\u2029')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson, если он установлен, иначе на json.
+
+    Для больших списков умеет отдавать ответ частями (iter_render), см.
+    api.mixins.FastJSONMixin.
+    """
+    # Списки длиннее порога отдаются StreamingHttpResponse; None — взять
+    # FAST_JSON_STREAM_THRESHOLD из настроек.
+    stream_threshold = None
+    chunk_size = 200
+
+    def get_stream_threshold(self):
+        if self.stream_threshold is None:
+            return settings.FAST_JSON_STREAM_THRESHOLD
+        return self.stream_threshold
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Отступы нужны только браузеру, отдаём их стандартным путём.
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return dumps(data)
+
+    def iter_render(self, data):
+        """Кодирует список или страницу с results по частям."""
+        if isinstance(data, list):
+            yield from self.iter_list(data)
+            return
+        yield b'{'
+        for index, (key, value) in enumerate(data.items()):
+            yield (b',' if index else b'') + dumps(key) + b':'
+            if key == 'results':
+                yield from self.iter_list(value)
+            else:
+                yield dumps(value)
+        yield b'}'
+
+    def iter_list(self, items):
+        yield b'['
+        for start in range(0, len(items), self.chunk_size):
+            chunk = dumps(items[start:start + self.chunk_size])[1:-1]
+            if chunk:
+                yield (b',' if start else b'') + chunk
+        yield b']'
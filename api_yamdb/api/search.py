@@ -0,0 +1,91 @@
+import re
+
+from django.db import connection
+
+from reviews.models import SearchEntry
+
+WORD_RE = re.compile(r'\w+')
+
+RESULT_COLUMNS = ('kind', 'object_id', 'title_id', 'review_id', 'body')
+RESULT_FIELDS = ('type', 'id', 'title_id', 'review_id', 'text')
+
+
+def make_terms(query):
+    return WORD_RE.findall(query.lower())
+
+
+class SearchResults:
+    """Ленивый результат поиска для Paginator: count() и срезы."""
+
+    def __init__(self, query, kind=None):
+        self.terms = make_terms(query)
+        self.kind = kind
+
+    def get_match(self):
+        if connection.vendor == 'postgresql':
+            return (
+                "document @@ to_tsquery('simple', %s)",
+                ' & '.join(f'{term}:*' for term in self.terms)
+            )
+        return (
+            'search_index MATCH %s',
+            ' '.join(f'"{term}"*' for term in self.terms)
+        )
+
+    def get_where(self):
+        match, param = self.get_match()
+        where, params = [match], [param]
+        if self.kind:
+            where.append('kind = %s')
+            params.append(self.kind)
+        return ' AND '.join(where), params
+
+    def count(self):
+        if not self.terms:
+            return 0
+        where, params = self.get_where()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM search_index WHERE {where}', params
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        if not self.terms:
+            return []
+        where, params = self.get_where()
+        if connection.vendor == 'postgresql':
+            rank = "ts_rank(document, to_tsquery('simple', %s)) DESC"
+            params = params + [params[0]]
+        else:
+            rank = 'bm25(search_index)'
+        start = item.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {", ".join(RESULT_COLUMNS)} FROM search_index '
+                f'WHERE {where} ORDER BY {rank}, rowid LIMIT %s OFFSET %s',
+                params + [item.stop - start, start]
+            )
+            return [
+                dict(zip(RESULT_FIELDS, row)) for row in cursor.fetchall()
+            ]
+
+
+def index_objects(entries, replace=True):
+    entries = list(entries)
+    if replace:
+        SearchEntry.objects.filter(
+            rowid__in=[entry.rowid for entry in entries]
+        ).delete()
+    SearchEntry.objects.bulk_create(entries)
+
+
+def unindex_object(kind, object_id):
+    SearchEntry.objects.filter(
+        rowid=SearchEntry.make_rowid(kind, object_id)
+    ).delete()
@@ -1,21 +1,229 @@
-from django.contrib.auth import authenticate
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from core import confirmation_codes
+from core.jwt_authentication import RoleAccessToken
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleStats, User)
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который берёт объекты, заранее загруженные
+    BulkListSerializer, вместо запроса на каждое значение."""
+
+    def to_internal_value(self, data):
+        queryset = self.get_queryset()
+        loaded = self.context.get('related_objects', {}).get(
+            (queryset.model, self.slug_field)
+        )
+        if loaded is None:
+            return super().to_internal_value(data)
+        try:
+            return loaded[data]
+        except (KeyError, TypeError):
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Пакетная проверка и запись списка объектов модели.
+
+    Связанные объекты по slug загружаются одним запросом на поле,
+    уникальность проверяется одним запросом на ограничение, запись идёт
+    через bulk_create и bulk_update. Транзакцию открывает представление.
+    """
+    batch_size = 1000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Уникальность проверяет validate() сразу для всего списка.
+        self.child.validators = [
+            validator for validator in self.child.validators
+            if not isinstance(validator, UniqueTogetherValidator)
+        ]
+        for field in self.child.fields.values():
+            field.validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+
+    @property
+    def model(self):
+        return self.child.Meta.model
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.context['related_objects'] = self.load_related(data)
+        attrs = super().to_internal_value(data)
+        # Здесь, а не в validate(): ListSerializer завернул бы список
+        # ошибок по объектам в non_field_errors.
+        self.validate_unique(attrs)
+        return attrs
+
+    def load_related(self, data):
+        related = {}
+        for name, field in self.child.fields.items():
+            relation = getattr(field, 'child_relation', field)
+            if field.read_only or not isinstance(
+                    relation, CachedSlugRelatedField):
+                continue
+            slugs = set()
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                values = value if isinstance(value, list) else [value]
+                slugs.update(
+                    value for value in values if isinstance(value, str)
+                )
+            queryset = relation.get_queryset()
+            related[(queryset.model, relation.slug_field)] = {
+                getattr(obj, relation.slug_field): obj
+                for obj in queryset.filter(
+                    **{f'{relation.slug_field}__in': slugs})
+            } if slugs else {}
+        return related
+
+    def get_unique_sets(self):
+        opts = self.model._meta
+        return [
+            (field.name,) for field in opts.concrete_fields
+            if field.unique and not field.primary_key
+        ] + [constraint.fields for constraint in opts.total_unique_constraints]
+
+    def validate_unique(self, attrs):
+        """Уникальность по базе и внутри пакета; ошибки — списком по
+        индексам объектов, как у ListSerializer."""
+        instances = self.instance or [None] * len(attrs)
+        errors = [{} for _ in attrs]
+        for fields in self.get_unique_sets():
+            keys = [
+                tuple(
+                    item[field] if field in item
+                    else getattr(instance, field, None)
+                    for field in fields
+                )
+                for item, instance in zip(attrs, instances)
+            ]
+            existing = self.model.objects.exclude(
+                pk__in=[instance.pk for instance in instances if instance]
+            ).filter(**{
+                f'{field}__in': {key[index] for key in keys}
+                for index, field in enumerate(fields)
+            }).values_list(*fields)
+            taken = set(existing)
+            for index, key in enumerate(keys):
+                if key in taken:
+                    message = 'Объект с такими значениями уже существует.'
+                    errors[index].setdefault(
+                        fields[0] if len(fields) == 1
+                        else 'non_field_errors', []
+                    ).append(message)
+                taken.add(key)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+    def pop_many_to_many(self, item):
+        return {
+            field.name: item.pop(field.name)
+            for field in self.model._meta.many_to_many if field.name in item
+        }
+
+    def set_many_to_many(self, instances, values, clear=False):
+        for field in self.model._meta.many_to_many:
+            changed = [
+                (instance, items[field.name])
+                for instance, items in zip(instances, values)
+                if field.name in items
+            ]
+            if not changed:
+                continue
+            through = field.remote_field.through
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            if clear:
+                through.objects.filter(**{
+                    f'{source}__in': [instance.pk for instance, _ in changed]
+                }).delete()
+            through.objects.bulk_create(
+                (
+                    through(**{source: instance.pk, target: related.pk})
+                    for instance, related_objects in changed
+                    for related in related_objects
+                ),
+                batch_size=self.batch_size
+            )
+
+    def fill_pks(self, instances):
+        """bulk_create заполняет pk не во всех СУБД (в SQLite — нет),
+        поэтому дочитываем их одним запросом по уникальным полям."""
+        missing = [instance for instance in instances if instance.pk is None]
+        if not missing:
+            return
+        fields = self.get_unique_sets()[0]
+        pks = {
+            tuple(row[1:]): row[0]
+            for row in self.model.objects.filter(**{
+                f'{field}__in': {
+                    getattr(instance, field) for instance in missing
+                }
+                for field in fields
+            }).values_list('pk', *fields)
+        }
+        for instance in missing:
+            instance.pk = pks[tuple(
+                getattr(instance, field) for field in fields
+            )]
+
+    def create(self, validated_data):
+        many_to_many = [self.pop_many_to_many(item) for item in validated_data]
+        instances = self.model.objects.bulk_create(
+            [self.model(**item) for item in validated_data],
+            batch_size=self.batch_size
+        )
+        self.fill_pks(instances)
+        self.set_many_to_many(instances, many_to_many)
+        return instances
+
+    def update(self, instances, validated_data):
+        many_to_many = [self.pop_many_to_many(item) for item in validated_data]
+        fields = set()
+        for instance, item in zip(instances, validated_data):
+            for attr, value in item.items():
+                setattr(instance, attr, value)
+            fields.update(item)
+        if fields:
+            self.model.objects.bulk_update(
+                instances, fields, batch_size=self.batch_size
+            )
+        self.set_many_to_many(instances, many_to_many, clear=True)
+        return instances
+
+
+class SlugSerializer(serializers.ModelSerializer):
+    """Жанр или категория: slug служит адресом объекта в URL."""
+
+    def validate_slug(self, slug):
+        # `{prefix}/bulk/` занят пакетными операциями BulkMixin: объект
+        # с таким slug нельзя было бы ни получить, ни удалить.
+        if slug == 'bulk':
+            raise serializers.ValidationError(
+                'Slug "bulk" зарезервирован.'
+            )
+        return slug
+
+
+class GenreSerializer(SlugSerializer):
     class Meta:
         exclude = ('id',)
         lookup_field = 'slug'
         model = Genre
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SlugSerializer):
     class Meta:
         exclude = ('id',)
         lookup_field = 'slug'
@@ -39,10 +247,10 @@ class TitleGetSerializer(serializers.ModelSerializer):
 
 
 class TitlePostSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
+    genre = CachedSlugRelatedField(
         slug_field='slug', many=True, queryset=Genre.objects.all()
     )
-    category = serializers.SlugRelatedField(
+    category = CachedSlugRelatedField(
         slug_field='slug', queryset=Category.objects.all()
     )
 
@@ -53,30 +261,46 @@ class TitlePostSerializer(serializers.ModelSerializer):
         model = Title
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    title = serializers.ReadOnlyField(source='title_id')
+    count = serializers.ReadOnlyField(source='title.rating_count')
+    sum = serializers.ReadOnlyField(source='title.rating_sum')
+    rating = serializers.IntegerField(source='title.rating', read_only=True)
+    histogram = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = (
+            'title', 'count', 'sum', 'rating', 'histogram', 'last_review'
+        )
+        model = TitleStats
+
+    def get_histogram(self, stats):
+        return {str(score): count for score, count in stats.histogram.items()}
+
+
 class ReviewSerializer(serializers.ModelSerializer):
-    title = serializers.SlugRelatedField(
-        read_only=True,
-        slug_field='id',
-    )
+    title = serializers.ReadOnlyField(source='title_id')
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
         default=serializers.CurrentUserDefault()
     )
 
-    def validate(self, data):
-        title_id = self.context['view'].kwargs.get('title_id')
-        author = self.context.get('request').user
-        title = get_object_or_404(Title, id=title_id)
-        if self.context.get('request').method != 'PATCH':
-            if title.reviews.filter(author=author).exists():
-                raise serializers.ValidationError(
-                    '"Вы уже оставили отзыв на данное произведение"'
-                )
-        return data
+    def create(self, validated_data):
+        validated_data['title'] = self.context['title']
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                '"Вы уже оставили отзыв на данное произведение"'
+            )
 
     class Meta:
-        fields = ('id', 'title', 'text', 'author', 'score', 'pub_date')
+        fields = (
+            'id', 'title', 'text', 'author', 'score', 'pub_date',
+            'comments_count'
+        )
         model = Review
 
 
@@ -90,6 +314,10 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only=True
     )
 
+    def create(self, validated_data):
+        validated_data['review'] = self.context['review']
+        return super().create(validated_data)
+
     class Meta:
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comment
@@ -115,17 +343,21 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ('username', 'email')
 
     def validate(self, data):
-        if User.objects.filter(
-                email=data['email']).exists() and User.objects.filter(
-                username=data['username']).exists():
+        """Находит пользователя по паре (username, email) одним запросом.
+
+        Новая пара — self.user = None, пара существующего пользователя —
+        self.user, занятые username или email другим пользователем —
+        ошибка. Сравнение без учёта регистра, как и уникальные индексы.
+        """
+        users = User.objects.find_for_signup(data['username'], data['email'])
+        if not users:
+            self.user = None
+            return data
+        if len(users) == 1 and users[0].matches_signup(
+                data['username'], data['email']):
+            self.user = users[0]
             return data
-        if User.objects.filter(
-                email=data['email']).exists():
-            raise serializers.ValidationError('Неверный запрос!')
-        if User.objects.filter(
-                username=data['username']).exists():
-            raise serializers.ValidationError('Неверный запрос!')
-        return data
+        raise serializers.ValidationError('Неверный запрос!')
 
     def validate_username(self, username):
         if username.lower() == 'me':
@@ -135,39 +367,36 @@ class RegisterSerializer(serializers.ModelSerializer):
         return username
 
 
-class TokenSerializer(serializers.ModelSerializer,
-                      TokenObtainPairSerializer):
+class TokenSerializer(serializers.Serializer):
+    """Выдаёт access-токен по username и коду подтверждения.
 
-    def __init__(self, instance=None, data=..., **kwargs):
-        super().__init__(instance, data, **kwargs)
-        self.fields['password'].required = False
+    Пользователь ищется без учёта регистра, как при регистрации, одним
+    запросом и только с полями, нужными RoleAccessToken, без цепочки
+    AUTHENTICATION_BACKENDS. Код сверяется с записью найденного
+    пользователя, а в токен попадает его сохранённый username.
+    """
+    username = serializers.CharField()
+    confirmation_code = serializers.CharField()
 
-    class Meta:
-        model = User
-        fields = ('username', 'confirmation_code')
+    token_fields = ('id', 'username', 'role', 'is_staff', 'is_superuser')
 
     def validate(self, attrs):
-        authenticate_kwargs = {
-            self.username_field: attrs[self.username_field],
-        }
-        confirm_code = None
-        if 'request' in self.context:
-            authenticate_kwargs['request'] = self.context['request']
-            confirm_code = self.context['request'].data['confirmation_code']
-
-        self.user = authenticate(**authenticate_kwargs)
+        self.user = User.objects.find_for_token(
+            attrs['username'], self.token_fields
+        )
 
         if self.user is None:
             raise NotFound(
                 'Пользователя не существует.'
             )
 
-        if self.user.confirmation_code != confirm_code:
+        if not confirmation_codes.verify(
+                self.user.pk, attrs['confirmation_code']):
             raise serializers.ValidationError(
                 'Не верный confirmation_code.'
             )
 
-        access = AccessToken.for_user(self.user)
+        access = RoleAccessToken.for_user(self.user)
 
         return {
             'token': str(access)
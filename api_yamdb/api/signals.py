@@ -0,0 +1,125 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from reviews.models import (Category, Comment, Genre, Review, SearchEntry,
+                            Title, TitleStats)
+from . import cache, search
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    cache.invalidate(cache.CATEGORIES, cache.TITLES)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, **kwargs):
+    cache.invalidate(cache.GENRES, cache.TITLES)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def title_changed(sender, **kwargs):
+    cache.invalidate(cache.TITLES)
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, created, **kwargs):
+    search.index_objects(
+        [SearchEntry.for_title(instance)], replace=not created
+    )
+
+
+@receiver(post_save, sender=Review)
+def index_review(sender, instance, created, **kwargs):
+    search.index_objects(
+        [SearchEntry.for_review(instance)], replace=not created
+    )
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, created, **kwargs):
+    search.index_objects(
+        [SearchEntry.for_comment(instance)], replace=not created
+    )
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    search.unindex_object(SearchEntry.TITLE, instance.id)
+
+
+@receiver(post_delete, sender=Review)
+def unindex_review(sender, instance, **kwargs):
+    search.unindex_object(SearchEntry.REVIEW, instance.id)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    search.unindex_object(SearchEntry.COMMENT, instance.id)
+
+
+# Счётчики обновляются сигналами, а не во вьюсетах, чтобы их учитывали
+# и каскадные удаления (пользователя, произведения, отзыва), и админка.
+# Загрузка фикстур (raw) и bulk_create сигналов не вызывают —
+# после них нужны rebuild_ratings и rebuild_comment_counts.
+
+@receiver(pre_save, sender=Review)
+def remember_score(sender, instance, raw, using, update_fields, **kwargs):
+    """Запоминает оценку отзыва в БД до сохранения.
+
+    Читается она заново, а не берётся с загрузки: save() пишет оценку
+    и тогда, когда запрос её не менял, и устаревшая копия сдвинула бы
+    рейтинг. Внутри транзакции строка блокируется до коммита, чтобы
+    параллельное изменение того же отзыва прочитало уже новую оценку.
+    """
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and 'score' not in update_fields:
+        instance._saved_score = instance.score
+    elif transaction.get_connection(using).in_atomic_block:
+        instance._saved_score = Review.locked_score(instance.pk, using)
+    else:
+        instance._saved_score = Review.objects.using(using).filter(
+            pk=instance.pk).values_list('score', flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def count_review(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    old_score = getattr(instance, '_saved_score', None)
+    if created or old_score is None:
+        Title.update_rating(instance.title_id, instance.score, 1)
+        TitleStats.record(
+            instance.title_id, added=instance.score,
+            pub_date=instance.pub_date
+        )
+    elif instance.score != old_score:
+        Title.update_rating(instance.title_id, instance.score - old_score)
+        TitleStats.record(
+            instance.title_id, added=instance.score, removed=old_score
+        )
+
+
+@receiver(post_delete, sender=Review)
+def uncount_review(sender, instance, **kwargs):
+    Title.update_rating(instance.title_id, -instance.score, -1)
+    TitleStats.record(instance.title_id, removed=instance.score)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        Review.update_comments_count(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    Review.update_comments_count(instance.review_id, -1)
@@ -0,0 +1,118 @@
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'10/min' -> (10, 60): ёмкость корзины и период её наполнения."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+# Сколько секунд ждать блокировку корзины в общем кэше; столько же живёт
+# сама блокировка, если процесс-владелец не успел её снять.
+LOCK_TIMEOUT = 1
+
+local_lock = threading.Lock()
+
+
+@contextmanager
+def bucket_lock(cache, key):
+    """Делает чтение и запись корзины одной операцией.
+
+    LocMemCache живёт в одном процессе, и хватает блокировки потоков.
+    В общем кэше (memcached, Redis) блокировка — запись, которую атомарно
+    создаёт add; если её не удалось взять за LOCK_TIMEOUT, корзина
+    обновляется без неё, а не блокирует запрос.
+    """
+    if isinstance(cache, LocMemCache):
+        with local_lock:
+            yield
+        return
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    while not locked and time.monotonic() < deadline:
+        time.sleep(0.001)
+        locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    try:
+        yield
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ограничение частоты по алгоритму token bucket.
+
+    Ставка берётся из DEFAULT_THROTTLE_RATES по throttle_scope
+    представления: '10/min' — корзина на 10 запросов, которая
+    равномерно наполняется за минуту. Представления без throttle_scope
+    или без ставки не ограничиваются. Состояние корзины — одна запись
+    в кэше THROTTLE_CACHE, так что проверка — O(1) и без запросов к БД;
+    чтение и запись корзины выполняются под bucket_lock.
+    """
+    kind = None
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        capacity, period = parse_rate(rate)
+        # Ключ memcached не может содержать пробелы и управляющие символы.
+        ident = hashlib.md5(self.get_ident_key(request).encode()).hexdigest()
+        key = f'throttle:{scope}:{self.kind}:{ident}'
+        cache = caches[settings.THROTTLE_CACHE]
+        # Без блокировки параллельные запросы прочли бы одно и то же
+        # число жетонов и прошли бы все.
+        with bucket_lock(cache, key):
+            now = time.time()
+            tokens, updated = cache.get(key, (capacity, now))
+            tokens = min(
+                capacity, tokens + (now - updated) * capacity / period
+            )
+            if tokens < 1:
+                self.wait_time = (1 - tokens) * period / capacity
+                return False
+            cache.set(key, (tokens - 1, now), period)
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    kind = 'ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Корзина на пользователя; для анонимных запросов — на username из
+    тела запроса (подбор кода подтверждения), иначе на IP."""
+    kind = 'user'
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'id:{request.user.pk}'
+        username = request.data.get('username') if hasattr(
+            request.data, 'get') else None
+        if isinstance(username, str) and username:
+            return f'name:{username.lower()}'
+        return f'ip:{self.get_ident(request)}'
@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework import routers
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    RegisterView, ReviewViewSet, TitleViewSet, TokenView,
-                    UserViewSet)
+                    MetricsView, RegisterView, ReviewViewSet, SearchView,
+                    TitleViewSet, TokenView, UserViewSet)
 
 router_v1 = routers.DefaultRouter()
 router_v1.register(
@@ -44,4 +44,6 @@ router_v1_auth = [
 urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/', include(router_v1_auth)),
+    path('v1/search/', SearchView.as_view(), name='search'),
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
 ]
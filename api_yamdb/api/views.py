@@ -1,27 +1,40 @@
-from django.db.models.aggregates import Avg
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, views, viewsets
+from rest_framework import filters, serializers, status, views, viewsets
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenViewBase
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from core import confirmation_codes
+from core.metrics import registry
+from reviews.models import (Category, Comment, Genre, QueuedMail, Review,
+                            SearchEntry, Title, TitleStats, User)
 from .filters import TitleFilter
-from .mixins import CDLViewSet
-from .paginations import CategoryPagination
+from . import cache, search
+from .mixins import (ActionThrottleMixin, BulkMixin, CachedListMixin,
+                     CDLViewSet, FastJSONMixin, RowListMixin,
+                     TimedListMixin, TimedRetrieveMixin)
+from .paginations import CategoryPagination, OptionalCursorPagination
+from .search import SearchResults
 from .permissions import (AuthorOrHasRoleOrReadOnly, IsAdmin,
                           IsAdminUserOrReadOnly)
+from .row_serializers import (CommentRowSerializer, ReviewRowSerializer,
+                              TitleRowSerializer)
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, RegisterSerializer,
                           ReviewSerializer, TitleGetSerializer,
-                          TitlePostSerializer, TokenSerializer, UserSerializer)
-from .utils import generate_confirmation_code
+                          TitlePostSerializer, TitleStatsSerializer,
+                          TokenSerializer, UserSerializer)
+from .throttling import IPTokenBucketThrottle, UserTokenBucketThrottle
 
 
-class CategoryViewSet(CDLViewSet):
+class CategoryViewSet(BulkMixin, CachedListMixin, CDLViewSet):
+    cache_namespace = cache.CATEGORIES
+    bulk_cache_namespaces = (cache.CATEGORIES, cache.TITLES)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     filter_backends = [filters.SearchFilter, ]
@@ -31,7 +44,9 @@ class CategoryViewSet(CDLViewSet):
     pagination_class = CategoryPagination
 
 
-class GenreViewSet(CDLViewSet):
+class GenreViewSet(BulkMixin, CachedListMixin, CDLViewSet):
+    cache_namespace = cache.GENRES
+    bulk_cache_namespaces = (cache.GENRES, cache.TITLES)
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     search_fields = ['=name', ]
@@ -40,9 +55,13 @@ class GenreViewSet(CDLViewSet):
     filter_backends = [filters.SearchFilter]
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('-year')
+class TitleViewSet(FastJSONMixin, BulkMixin, CachedListMixin, RowListMixin,
+                   viewsets.ModelViewSet):
+    cache_namespace = cache.TITLES
+    bulk_cache_namespaces = (cache.TITLES,)
+    row_serializer_class = TitleRowSerializer
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre').order_by('-year')
     permission_classes = [IsAdminUserOrReadOnly, ]
     filter_backends = [DjangoFilterBackend, ]
     filterset_class = TitleFilter
@@ -52,44 +71,115 @@ class TitleViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleGetSerializer
+        if self.action == 'stats':
+            return TitleStatsSerializer
         return TitlePostSerializer
 
+    def perform_bulk_create(self, serializer):
+        super().perform_bulk_create(serializer)
+        search.index_objects(
+            [SearchEntry.for_title(title) for title in serializer.instance],
+            replace=False
+        )
+
+    def perform_bulk_update(self, serializer):
+        super().perform_bulk_update(serializer)
+        search.index_objects(
+            [SearchEntry.for_title(title) for title in serializer.instance]
+        )
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        title = get_object_or_404(
+            Title.objects.select_related('stats'), pk=pk
+        )
+        try:
+            stats = title.stats
+        except TitleStats.DoesNotExist:
+            stats = TitleStats(title=title)
+        return Response(self.get_serializer(stats).data)
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(FastJSONMixin, ActionThrottleMixin, RowListMixin,
+                    viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    row_serializer_class = ReviewRowSerializer
     permission_classes = [AuthorOrHasRoleOrReadOnly, ]
+    throttle_classes = [IPTokenBucketThrottle, UserTokenBucketThrottle]
+    throttle_scope = 'reviews'
+    pagination_class = OptionalCursorPagination
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, id=self.kwargs['title_id'])
+        return self._title
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs['title_id'])
-        return title.reviews.all()
+        if self.action == 'list':
+            reviews = self.get_title().reviews
+        else:
+            reviews = Review.objects.filter(title_id=self.kwargs['title_id'])
+        return reviews.select_related('author')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'create':
+            context['title'] = self.get_title()
+        return context
 
+    # Рейтинг и гистограмму обновляют сигналы api.signals в той же
+    # транзакции, что и отзыв.
+    @transaction.atomic
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs['title_id'])
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(FastJSONMixin, ActionThrottleMixin, RowListMixin,
+                     viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    row_serializer_class = CommentRowSerializer
     permission_classes = [AuthorOrHasRoleOrReadOnly, ]
+    throttle_classes = [IPTokenBucketThrottle, UserTokenBucketThrottle]
+    throttle_scope = 'comments'
+    pagination_class = OptionalCursorPagination
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id'])
+        return self._review
 
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs['review_id'],
-            title__id=self.kwargs['title_id'])
-        return review.comments.all()
+        if self.action == 'list':
+            comments = self.get_review().comments
+        else:
+            comments = Comment.objects.filter(
+                review_id=self.kwargs['review_id'],
+                review__title_id=self.kwargs['title_id'])
+        return comments.select_related('author')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'create':
+            context['review'] = self.get_review()
+        return context
 
+    # Счётчик комментариев отзыва обновляют сигналы api.signals.
+    @transaction.atomic
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs['review_id'],
-            title__id=self.kwargs['title_id'])
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(FastJSONMixin, TimedListMixin, TimedRetrieveMixin,
+                  viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser | IsAdmin]
@@ -118,24 +208,68 @@ class UserViewSet(viewsets.ModelViewSet):
 
 class RegisterView(views.APIView):
     permission_classes = [AllowAny, ]
+    throttle_classes = [IPTokenBucketThrottle, UserTokenBucketThrottle]
+    throttle_scope = 'auth'
 
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        username = serializer.validated_data['username']
-        email = serializer.validated_data['email']
-        user, _ = User.objects.get_or_create(username=username,
-                                             email=email)
-        user.email_user(
+        user = serializer.user
+        if user is None:
+            try:
+                with transaction.atomic():
+                    user = User.objects.create_user(
+                        username=serializer.validated_data['username'],
+                        email=serializer.validated_data['email']
+                    )
+                    code = confirmation_codes.issue(user, created=True)
+            except IntegrityError:
+                # Параллельная регистрация заняла username или email.
+                raise serializers.ValidationError('Неверный запрос!')
+        else:
+            code = confirmation_codes.issue(user)
+        QueuedMail.objects.enqueue(
             subject='Confirmation_code для YaMDB',
-            message=f'Сonfirmation_code {user.confirmation_code}',
-            fail_silently=False
+            message=f'Сonfirmation_code {code}',
+            recipient=user.email
         )
-        user.confirmation_code = generate_confirmation_code()
-        user.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class TokenView(TokenViewBase):
     permission_classes = (AllowAny,)
+    throttle_classes = [IPTokenBucketThrottle, UserTokenBucketThrottle]
+    throttle_scope = 'auth'
     serializer_class = TokenSerializer
+
+
+class SearchView(views.APIView):
+    permission_classes = [AllowAny, ]
+    pagination_class = PageNumberPagination
+    search_types = ('title', 'review', 'comment')
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        search_type = request.query_params.get('type')
+        if not query:
+            raise serializers.ValidationError(
+                {'q': 'Укажите строку поиска.'}
+            )
+        if search_type and search_type not in self.search_types:
+            raise serializers.ValidationError(
+                {'type': f'Допустимые типы: {", ".join(self.search_types)}.'}
+            )
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            SearchResults(query, search_type), request, view=self
+        )
+        return paginator.get_paginated_response(page)
+
+
+class MetricsView(views.APIView):
+    permission_classes = [IsAdminUser | IsAdmin]
+
+    def get(self, request):
+        return HttpResponse(
+            registry.expose(), content_type='text/plain; version=0.0.4'
+        )
@@ -3,5 +3,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+# Под ASGI чтение произведений, отзывов и комментариев идёт через
+# асинхронные представления api.async_views.
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'api_yamdb.asgi_urls')
 
 application = get_asgi_application()
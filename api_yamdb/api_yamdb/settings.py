@@ -27,6 +27,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -36,7 +38,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'api_yamdb.urls'
+ROOT_URLCONF = os.getenv('DJANGO_ROOT_URLCONF', 'api_yamdb.urls')
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
@@ -58,12 +60,65 @@ TEMPLATES = [
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Профиль БД выбирается переменной окружения DB_PROFILE:
+# sqlite (по умолчанию, локальная разработка) или postgresql.
+DB_PROFILE = os.getenv('DB_PROFILE', 'sqlite')
+
+if DB_PROFILE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'yamdb'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'POOL_SIZE': int(os.getenv('DB_POOL_SIZE', 0)),
+            'POOL_TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'timeout': 20,
+            },
+            'PRAGMAS': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 20000,
+            },
+        }
+    }
+
+# Реплики для чтения: DB_REPLICA_HOSTS (PostgreSQL, через запятую) или
+# SQLITE_REPLICA (путь к копии файла БД для локальной проверки).
+if DB_PROFILE == 'postgresql':
+    for number, host in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), 1
+    ):
+        DATABASES[f'replica{number}'] = {
+            **DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}
+        }
+elif os.getenv('SQLITE_REPLICA'):
+    DATABASES['replica1'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('SQLITE_REPLICA'),
+        'TEST': {'MIRROR': 'default'},
     }
-}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+# Сколько секунд после записи читать данные пользователя из default.
+REPLICA_PIN_SECONDS = 5
+# Алиас из CACHES для этих отметок. При нескольких процессах он должен
+# указывать на общий кэш (Redis, Memcached): LocMemCache годится только
+# для одного процесса.
+REPLICA_PIN_CACHE = 'default'
 
 AUTH_USER_MODEL = "reviews.User"
 
@@ -104,11 +159,18 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.jwt_authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
 
+    # Ставки api.throttling.TokenBucketThrottle по throttle_scope.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth': os.getenv('THROTTLE_AUTH_RATE', '30/min'),
+        'reviews': os.getenv('THROTTLE_REVIEWS_RATE', '30/min'),
+        'comments': os.getenv('THROTTLE_COMMENTS_RATE', '60/min'),
+    },
+
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
@@ -118,7 +180,7 @@ AUTHENTICATION_BACKENDS = (
 )
 
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(days=7),
+    'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -126,5 +188,45 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Кэш ответов каталога (api.cache): алиас из CACHES и время жизни, секунды.
+CATALOG_CACHE = 'default'
+CATALOG_CACHE_TIMEOUT = 300
+
+# Списки длиннее порога FastJSONRenderer отдаёт потоком (api.mixins).
+FAST_JSON_STREAM_THRESHOLD = int(os.getenv('FAST_JSON_STREAM_THRESHOLD', 100))
+
+# Кэш корзин ограничения частоты запросов (api.throttling).
+THROTTLE_CACHE = 'default'
+
+# Кэш пользователей для токенов без claims роли, секунды и записи.
+# Тот же срок живёт состояние пользователя, с которым сверяются claims
+# токенов с ролью; его кэш должен быть общим для всех процессов
+# (LocMemCache годится только для одного процесса).
+JWT_USER_CACHE_TTL = 30
+JWT_USER_CACHE_SIZE = 10000
+JWT_USER_STATE_CACHE = 'default'
+
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+# Коды подтверждения (core.confirmation_codes): срок жизни, секунды;
+# число неудачных попыток; период фоновой очистки, секунды (0 — только
+# командой sweep_confirmation_codes); алиас кэша.
+CONFIRMATION_CODE_TTL = 24 * 60 * 60
+CONFIRMATION_CODE_MAX_ATTEMPTS = 5
+CONFIRMATION_CODE_SWEEP_INTERVAL = 60 * 60
+CONFIRMATION_CODE_CACHE = 'default'
+
+# Очередь исходящих писем (core.mail_queue): письма сохраняются в БД
+# и отправляются пачками фоновым потоком или командой send_mail_queue.
+MAIL_QUEUE_EAGER = False
+MAIL_QUEUE_BATCH_SIZE = 100
+MAIL_QUEUE_MAX_ATTEMPTS = 5
+MAIL_QUEUE_RETRY_DELAY = 60
+MAIL_QUEUE_POLL_INTERVAL = 5
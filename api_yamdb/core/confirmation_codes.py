@@ -0,0 +1,171 @@
+"""Хранилище кодов подтверждения.
+
+В БД (reviews.ConfirmationCode) лежит только SHA-256 кода, срок
+действия и счётчик неудачных попыток. Код длиной CODE_LENGTH из
+CODE_CHARS несёт около 90 бит случайности, поэтому соль и секретный
+ключ не нужны, и хэш проверяется любым процессом после перезапуска.
+Та же запись кладётся в кэш CONFIRMATION_CODE_CACHE, чтобы не читать
+её из БД перед погашением; при промахе или несовпадении решает БД —
+кэш другого процесса может хранить уже заменённый код.
+"""
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from reviews.constants import CODE_LENGTH
+from reviews.models import ConfirmationCode
+
+logger = logging.getLogger(__name__)
+
+CODE_CHARS = 'abcdefghjkmnpqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+
+_sweeper_lock = threading.Lock()
+_sweeper = None
+
+
+def get_cache():
+    return caches[settings.CONFIRMATION_CODE_CACHE]
+
+
+def cache_key(user_id):
+    return f'confirmation-code:{user_id}'
+
+
+def make_hash(code):
+    return hashlib.sha256(str(code).encode()).hexdigest()
+
+
+def issue(user, created=False):
+    """Выдаёт пользователю новый код и возвращает его.
+
+    Прежний код и счётчик попыток сбрасываются. created=True — для
+    только что созданного пользователя: записи точно нет, сразу INSERT.
+    """
+    code = get_random_string(CODE_LENGTH, CODE_CHARS)
+    values = {
+        'code_hash': make_hash(code),
+        'expires': timezone.now() + timedelta(
+            seconds=settings.CONFIRMATION_CODE_TTL
+        ),
+        'attempts': 0,
+    }
+    if created:
+        ConfirmationCode.objects.create(user_id=user.pk, **values)
+    elif not ConfirmationCode.objects.filter(
+            user_id=user.pk).update(**values):
+        try:
+            with transaction.atomic():
+                ConfirmationCode.objects.create(user_id=user.pk, **values)
+        except IntegrityError:
+            # Код успел выдать параллельный запрос — перезаписываем его.
+            ConfirmationCode.objects.filter(user_id=user.pk).update(**values)
+    entry = (values['code_hash'], values['expires'], 0)
+    transaction.on_commit(lambda: get_cache().set(
+        cache_key(user.pk), entry, settings.CONFIRMATION_CODE_TTL
+    ))
+    start_sweeper()
+    return code
+
+
+def load(user_id):
+    entry = get_cache().get(cache_key(user_id))
+    if entry is None:
+        row = ConfirmationCode.objects.filter(user_id=user_id).values_list(
+            'code_hash', 'expires', 'attempts'
+        ).first()
+        if row is None:
+            return None
+        entry = row
+        get_cache().set(
+            cache_key(user_id), entry, settings.CONFIRMATION_CODE_TTL
+        )
+    return entry
+
+
+def is_valid(entry, code_hash):
+    stored_hash, expires, attempts = entry
+    return (
+        expires > timezone.now()
+        and attempts < settings.CONFIRMATION_CODE_MAX_ATTEMPTS
+        and hmac.compare_digest(stored_hash, code_hash)
+    )
+
+
+def redeem(user_id, code_hash):
+    """Гасит код; True, если запись удалил именно этот вызов."""
+    deleted, _ = ConfirmationCode.objects.filter(
+        user_id=user_id,
+        code_hash=code_hash,
+        expires__gt=timezone.now(),
+        attempts__lt=settings.CONFIRMATION_CODE_MAX_ATTEMPTS,
+    ).delete()
+    get_cache().delete(cache_key(user_id))
+    return bool(deleted)
+
+
+def verify(user_id, code):
+    """Проверяет и гасит код: по одному коду выдаётся один токен.
+
+    Неудачная попытка увеличивает счётчик. Из двух одновременных
+    запросов с верным кодом успешен только тот, что удалил запись.
+    """
+    code_hash = make_hash(code)
+    entry = load(user_id)
+    if entry is not None and is_valid(entry, code_hash):
+        if redeem(user_id, code_hash):
+            return True
+    # Кэш мог устареть: окончательное решение — по БД.
+    get_cache().delete(cache_key(user_id))
+    entry = load(user_id)
+    if entry is None:
+        return False
+    if is_valid(entry, code_hash):
+        return redeem(user_id, code_hash)
+    ConfirmationCode.objects.filter(user_id=user_id).update(
+        attempts=F('attempts') + 1
+    )
+    get_cache().delete(cache_key(user_id))
+    return False
+
+
+def sweep():
+    """Удаляет просроченные коды одним запросом; возвращает их число."""
+    deleted, _ = ConfirmationCode.objects.filter(
+        expires__lte=timezone.now()
+    ).delete()
+    return deleted
+
+
+def run_sweeper():
+    while True:
+        time.sleep(settings.CONFIRMATION_CODE_SWEEP_INTERVAL)
+        try:
+            sweep()
+        except Exception:
+            logger.exception('Ошибка при удалении просроченных кодов')
+        finally:
+            close_old_connections()
+
+
+def start_sweeper():
+    """Запускает фоновую очистку, если она включена и ещё не идёт."""
+    global _sweeper
+    if settings.CONFIRMATION_CODE_SWEEP_INTERVAL <= 0:
+        return
+    with _sweeper_lock:
+        if _sweeper is None or not _sweeper.is_alive():
+            _sweeper = threading.Thread(
+                target=run_sweeper, name='confirmation-code-sweeper',
+                daemon=True
+            )
+            _sweeper.start()
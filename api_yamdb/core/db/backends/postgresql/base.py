@@ -0,0 +1,110 @@
+import threading
+
+import psycopg2.extras
+import psycopg2.pool
+from django.db.backends.postgresql import base
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class BlockingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """Пул, который при исчерпании ждёт освободившееся соединение.
+
+    ThreadedConnectionPool сразу бросает PoolError, и при потоках больше
+    maxconn (например, в пуле sync_to_async под ASGI) запрос падал бы
+    с 500. Здесь поток ждёт не дольше timeout секунд, после чего
+    получает OperationalError, как при недоступной БД.
+    """
+
+    def __init__(self, minconn, maxconn, *args, timeout=None, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise psycopg2.OperationalError(
+                f'Нет свободного соединения в пуле за {self.timeout} с.'
+            )
+        try:
+            return super().getconn(key)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def putconn(self, conn, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self.slots.release()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL с проверкой соединений и необязательным пулом.
+
+    CONN_HEALTH_CHECKS: перед первым запросом в рамках HTTP-запроса
+    повторно используемое соединение проверяется и при обрыве
+    пересоздаётся.
+    POOL_SIZE: если больше нуля, соединения берутся из пула процесса
+    и возвращаются в него при закрытии (CONN_MAX_AGE в этом случае
+    стоит оставить равным 0). Когда все POOL_SIZE соединений заняты,
+    поток ждёт освободившееся не дольше POOL_TIMEOUT секунд.
+    """
+
+    health_check_done = False
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None:
+                pool = BlockingConnectionPool(
+                    1, self.settings_dict['POOL_SIZE'],
+                    timeout=self.settings_dict.get('POOL_TIMEOUT'),
+                    **conn_params
+                )
+                _pools[self.alias] = pool
+            return pool
+
+    def get_new_connection(self, conn_params):
+        if not self.settings_dict.get('POOL_SIZE'):
+            return super().get_new_connection(conn_params)
+        connection = self.get_pool(conn_params).getconn()
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        if isolation_level is None:
+            self.isolation_level = connection.isolation_level
+        else:
+            self.isolation_level = isolation_level
+            if connection.isolation_level != isolation_level:
+                connection.set_session(isolation_level=isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None or not self.settings_dict.get('POOL_SIZE'):
+            return super()._close()
+        # Соединение после ошибок не возвращается в пул, а закрывается.
+        with self.wrap_database_errors:
+            _pools[self.alias].putconn(
+                self.connection,
+                close=self.errors_occurred or bool(self.connection.closed)
+            )
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def ensure_connection(self):
+        if (
+            self.connection is not None
+            and self.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not self.health_check_done
+            and not self.in_atomic_block
+        ):
+            if not self.is_usable():
+                self.errors_occurred = True
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
@@ -0,0 +1,68 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+current_request = ContextVar('current_request', default=None)
+
+
+def pin_key(user):
+    return f'replica-pin:{user.pk}'
+
+
+def pin_cache():
+    return caches[settings.REPLICA_PIN_CACHE]
+
+
+def pin_to_primary(user):
+    """Направляет чтения пользователя в основную БД на время задержки
+    репликации, чтобы он сразу увидел свои изменения.
+
+    Отметка хранится в кэше REPLICA_PIN_CACHE: при нескольких процессах
+    он должен быть общим, иначе следующий GET может попасть в процесс,
+    который об отметке не знает, и прочитать отстающую реплику.
+    """
+    pin_cache().set(pin_key(user), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(request):
+    pinned = getattr(request, '_replica_pinned', None)
+    if pinned is None:
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return False
+        pinned = request._replica_pinned = bool(
+            pin_cache().get(pin_key(user))
+        )
+    return pinned
+
+
+class ReplicaRouter:
+    """Чтения безопасных HTTP-запросов идут в реплики DATABASE_REPLICAS.
+
+    Запись, чтения вне HTTP-запроса, внутри небезопасных запросов и
+    чтения недавно писавшего пользователя идут в default.
+    """
+
+    def db_for_read(self, model, **hints):
+        request = current_request.get()
+        if (
+            not settings.DATABASE_REPLICAS
+            or request is None
+            or request.method not in SAFE_METHODS
+            or is_pinned(request)
+        ):
+            return 'default'
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,188 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import UserModel
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.constants import ADMIN, MODERATOR, USER
+
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+
+
+def get_cached_user(username):
+    """Возвращает пользователя из кэша процесса или из БД.
+
+    Записи живут JWT_USER_CACHE_TTL секунд и сбрасываются при изменении
+    или удалении пользователя в этом процессе.
+    """
+    now = time.monotonic()
+    cached = _user_cache.get(username)
+    if cached is not None and cached[0] > now:
+        return copy.copy(cached[1])
+    user = UserModel.objects.filter(username=username).first()
+    with _user_cache_lock:
+        if len(_user_cache) >= settings.JWT_USER_CACHE_SIZE:
+            _user_cache.clear()
+        _user_cache[username] = (now + settings.JWT_USER_CACHE_TTL, user)
+    return copy.copy(user)
+
+
+def user_state_key(user_id):
+    return f'jwt-user-state:{user_id}'
+
+
+def get_user_state(user_id):
+    """Возвращает (username, role, is_staff, is_superuser, is_active)
+    пользователя или пустой кортеж, если его нет.
+
+    Кортеж хранится в кэше JWT_USER_STATE_CACHE не дольше
+    JWT_USER_CACHE_TTL секунд и удаляется сигналами при изменении или
+    удалении пользователя. С LocMemCache сброс виден только своему
+    процессу, остальные увидят изменения через JWT_USER_CACHE_TTL.
+    """
+    cache = caches[settings.JWT_USER_STATE_CACHE]
+    key = user_state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = UserModel.objects.filter(pk=user_id).values_list(
+            'username', 'role', 'is_staff', 'is_superuser', 'is_active'
+        ).first() or ()
+        cache.set(key, tuple(state), settings.JWT_USER_CACHE_TTL)
+    return state
+
+
+def forget_cached_user(sender, instance, **kwargs):
+    _user_cache.pop(instance.username, None)
+    caches[settings.JWT_USER_STATE_CACHE].delete(user_state_key(instance.pk))
+
+
+post_save.connect(forget_cached_user, sender=settings.AUTH_USER_MODEL)
+post_delete.connect(forget_cached_user, sender=settings.AUTH_USER_MODEL)
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с ролью и флагами пользователя в claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['uid'] = user.pk
+        token['role'] = user.role
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        return token
+
+
+class ClaimsUser(SimpleLazyObject):
+    """Пользователь, описанный claims токена.
+
+    Роль и флаги берутся из токена, уже сверенного с get_user_state;
+    модель User загружается (через кэш) только при обращении к
+    остальным атрибутам, например при сохранении автора отзыва.
+    """
+
+    def __init__(self, token):
+        super().__init__(self.load_user)
+        self.__dict__['token'] = token
+
+    def load_user(self):
+        user = get_cached_user(self.username)
+        if user is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        return user
+
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+
+    @property
+    def pk(self):
+        return self.token['uid']
+
+    id = pk
+
+    @property
+    def username(self):
+        return self.token[api_settings.USER_ID_CLAIM]
+
+    @property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_staff(self):
+        return self.token['is_staff']
+
+    @property
+    def is_superuser(self):
+        return self.token['is_superuser']
+
+    @property
+    def is_user(self):
+        return self.role == USER
+
+    @property
+    def is_admin(self):
+        return self.role == ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == MODERATOR
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без загрузки модели User для токенов с ролью.
+
+    Claims токена сверяются с кэшированным состоянием пользователя:
+    токен удалённого, заблокированного пользователя или выпущенный до
+    смены роли, флагов или username отклоняется. Токены без claims роли
+    (выпущенные обычным AccessToken) обслуживаются через кэш
+    пользователей.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' in validated_token and 'uid' in validated_token:
+            self.check_claims(validated_token)
+            return ClaimsUser(validated_token)
+        user = get_cached_user(validated_token[api_settings.USER_ID_CLAIM])
+        if user is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive'
+            )
+        return user
+
+    def check_claims(self, validated_token):
+        state = get_user_state(validated_token['uid'])
+        if not state:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        *claims, is_active = state
+        if not is_active:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive'
+            )
+        if tuple(claims) != (
+                validated_token[api_settings.USER_ID_CLAIM],
+                validated_token['role'],
+                validated_token['is_staff'],
+                validated_token['is_superuser']):
+            raise AuthenticationFailed(
+                'Права пользователя изменились, получите новый токен.',
+                code='token_stale'
+            )
@@ -0,0 +1,111 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from reviews.models import QueuedMail
+
+logger = logging.getLogger(__name__)
+
+_wakeup = threading.Event()
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def claim_batch(batch_size):
+    """Забирает пачку писем, откладывая их повтор на MAIL_QUEUE_RETRY_DELAY.
+
+    Пока письмо отправляется, другие обработчики его не видят; если
+    отправка не удалась, оно вернётся в очередь после задержки.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            QueuedMail.objects.select_for_update(skip_locked=True).filter(
+                sent__isnull=True,
+                next_attempt__lte=now,
+                attempts__lt=settings.MAIL_QUEUE_MAX_ATTEMPTS,
+            ).values_list('id', flat=True)[:batch_size]
+        )
+        QueuedMail.objects.filter(id__in=ids).update(
+            attempts=F('attempts') + 1,
+            next_attempt=now + timedelta(
+                seconds=settings.MAIL_QUEUE_RETRY_DELAY
+            ),
+        )
+    return list(QueuedMail.objects.filter(id__in=ids))
+
+
+def deliver_pending(batch_size=None):
+    """Отправляет одну пачку писем через одно соединение.
+
+    Возвращает количество забранных из очереди писем.
+    """
+    batch = claim_batch(batch_size or settings.MAIL_QUEUE_BATCH_SIZE)
+    if not batch:
+        return 0
+    sent = []
+    connection = get_connection()
+    try:
+        connection.open()
+        for mail in batch:
+            try:
+                EmailMessage(
+                    mail.subject, mail.message, settings.DEFAULT_FROM_EMAIL,
+                    [mail.recipient], connection=connection
+                ).send()
+            except Exception as error:
+                logger.warning('Не удалось отправить письмо %s: %s',
+                               mail.id, error)
+                QueuedMail.objects.filter(id=mail.id).update(
+                    last_error=str(error)
+                )
+            else:
+                sent.append(mail.id)
+    finally:
+        connection.close()
+    # Тело отправленного письма не храним: в нём коды подтверждения.
+    QueuedMail.objects.filter(id__in=sent).update(
+        sent=timezone.now(), message=''
+    )
+    return len(batch)
+
+
+def deliver_all():
+    while deliver_pending():
+        pass
+
+
+def run_worker():
+    while True:
+        _wakeup.wait(settings.MAIL_QUEUE_POLL_INTERVAL)
+        _wakeup.clear()
+        try:
+            deliver_all()
+        except Exception:
+            logger.exception('Ошибка при отправке очереди писем')
+        finally:
+            close_old_connections()
+
+
+def notify():
+    """Сообщает отправщику о новых письмах.
+
+    При MAIL_QUEUE_EAGER письма отправляются сразу, в текущем потоке.
+    """
+    global _worker
+    if settings.MAIL_QUEUE_EAGER:
+        deliver_all()
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=run_worker, name='mail-queue', daemon=True
+            )
+            _worker.start()
+    _wakeup.set()
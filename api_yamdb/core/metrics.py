@@ -0,0 +1,90 @@
+import threading
+from bisect import bisect_left
+
+DURATION_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# (имя метрики, описание, границы корзин)
+FAMILIES = (
+    ('yamdb_request_duration_seconds', 'Время обработки запроса.',
+     DURATION_BUCKETS),
+    ('yamdb_db_duration_seconds', 'Время SQL-запросов за запрос.',
+     DURATION_BUCKETS),
+    ('yamdb_serialize_duration_seconds',
+     'Время сериализации ответа без SQL.', DURATION_BUCKETS),
+    ('yamdb_render_duration_seconds', 'Время рендеринга ответа.',
+     DURATION_BUCKETS),
+    ('yamdb_db_queries', 'Количество SQL-запросов за запрос.',
+     QUERY_BUCKETS),
+)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def expose(self, name, labels):
+        lines = []
+        cumulative = 0
+        bounds = [str(bucket) for bucket in self.buckets] + ['+Inf']
+        for bound, count in zip(bounds, self.counts):
+            cumulative += count
+            lines.append(
+                f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(f'{name}_sum{{{labels}}} {self.sum:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Гистограммы по маршрутам в памяти процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def observe(self, route, method, total, db_time, serialize_time,
+                render_time, queries):
+        with self.lock:
+            histograms = self.routes.get((route, method))
+            if histograms is None:
+                histograms = self.routes[(route, method)] = [
+                    Histogram(buckets) for _, _, buckets in FAMILIES
+                ]
+            for histogram, value in zip(
+                histograms,
+                (total, db_time, serialize_time, render_time, queries)
+            ):
+                histogram.observe(value)
+
+    def expose(self):
+        """Текстовый формат Prometheus."""
+        lines = []
+        with self.lock:
+            for index, (name, description, _) in enumerate(FAMILIES):
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} histogram')
+                for (route, method), histograms in sorted(
+                        self.routes.items()):
+                    lines.extend(histograms[index].expose(
+                        name, f'route="{route}",method="{method}"'
+                    ))
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self.lock:
+            self.routes.clear()
+
+
+registry = MetricsRegistry()
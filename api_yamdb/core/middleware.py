@@ -0,0 +1,175 @@
+import asyncio
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+from .db.routers import SAFE_METHODS, current_request, pin_to_primary
+from .metrics import registry
+
+
+class RequestTiming:
+    def __init__(self):
+        self.db_time = 0
+        self.queries = 0
+        self.render_time = 0
+        self.serialize_time = 0
+
+    def track_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+@contextmanager
+def track_queries(request):
+    """Учитывает запросы текущего потока в request.timing.
+
+    Соединения с БД живут в своём потоке, поэтому под ASGI учёт
+    подключают обёртки представлений api.async_views — в потоке, где
+    выполняется ORM.
+    """
+    timing = getattr(request, 'timing', None)
+    with ExitStack() as stack:
+        if timing is not None:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(timing.track_query)
+                )
+        yield
+
+
+@contextmanager
+def timed_serialization(request):
+    """Учитывает время сериализации ответа в request.timing.
+
+    SQL, выполненный при сериализации (ленивые связи, непройденный
+    QuerySet), уже посчитан в db и из этого времени вычитается.
+    """
+    timing = getattr(request, 'timing', None)
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    db_time = timing.db_time
+    try:
+        yield
+    finally:
+        timing.serialize_time += (
+            time.perf_counter() - started - (timing.db_time - db_time)
+        )
+
+
+class HybridMiddleware:
+    """Основа для middleware, работающих и под WSGI, и под ASGI.
+
+    Синхронное middleware в цепочке заставило бы Django выполнять
+    асинхронные представления через async_to_sync в отдельном потоке.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django распознаёт асинхронное middleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class RequestMetricsMiddleware(HybridMiddleware):
+    """Считает SQL-запросы, время БД, сериализации, рендеринга и общее
+    время запроса.
+
+    Значения отдаются в заголовке Server-Timing и копятся в
+    core.metrics.registry по имени маршрута (например, titles-list).
+    """
+
+    def handle(self, request):
+        request.timing = RequestTiming()
+        started = time.perf_counter()
+        with track_queries(request):
+            response = self.get_response(request)
+        return self.finish(request, response, started)
+
+    async def __acall__(self, request):
+        request.timing = RequestTiming()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.finish(request, response, started)
+
+    def finish(self, request, response, started):
+        timing = request.timing
+        total = time.perf_counter() - started
+
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timing.db_time * 1000:.2f};'
+            f'desc="{timing.queries} queries"',
+            f'serialize;dur={timing.serialize_time * 1000:.2f}',
+            f'render;dur={timing.render_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+        match = request.resolver_match
+        registry.observe(
+            match.url_name or match.view_name if match else 'unresolved',
+            request.method, total, timing.db_time, timing.serialize_time,
+            timing.render_time, timing.queries
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        started = time.perf_counter()
+
+        def rendered(response):
+            request.timing.render_time += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """Передаёт запрос роутеру БД и закрепляет автора записи за default."""
+
+    def handle(self, request):
+        token = current_request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.pin_author(request, response)
+        return response
+
+    async def __acall__(self, request):
+        # sync_to_async копирует контекст, так что роутер увидит запрос
+        # и в потоке, где выполняется ORM.
+        token = current_request.set(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.pin_author(request, response)
+        return response
+
+    def pin_author(self, request, response):
+        user = getattr(request, 'user', None)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            pin_to_primary(user)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (Category, Comment, ConfirmationCode, Genre, QueuedMail,
+                     Review, Title, User)
 
 
 @admin.register(Category)
@@ -40,3 +41,19 @@ class UserAdmin(admin.ModelAdmin):
     list_display = ('id', 'email', 'username', 'role')
     search_fields = ('email', 'username')
     list_filter = ('role',)
+
+
+@admin.register(QueuedMail)
+class QueuedMailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'created', 'attempts', 'sent')
+    search_fields = ('recipient',)
+    list_filter = ('sent',)
+    # До отправки в теле письма лежит код подтверждения открытым текстом.
+    exclude = ('message',)
+
+
+@admin.register(ConfirmationCode)
+class ConfirmationCodeAdmin(admin.ModelAdmin):
+    list_display = ('user', 'expires', 'attempts')
+    search_fields = ('user__username',)
+    exclude = ('code_hash',)
@@ -2,7 +2,7 @@ USER = 'user'
 MODERATOR = 'moderator'
 ADMIN = 'admin'
 
-CODE_LENGTH = 5
+CODE_LENGTH = 16
 
 ROLE_CHOICES = [
     (USER, 'user'),
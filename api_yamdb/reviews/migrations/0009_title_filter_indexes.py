@@ -0,0 +1,45 @@
+# Generated by Django 3.2 on 2026-10-18 18:03
+
+from django.db import migrations, models
+
+
+def create_search_indexes(apps, schema_editor):
+    # Обратное направление связи жанр -> произведения; прямое уже покрыто
+    # уникальным индексом (title_id, genre_id).
+    schema_editor.execute(
+        'CREATE INDEX title_genre_genre_title_idx '
+        'ON reviews_title_genre (genre_id, title_id)'
+    )
+    # name__icontains превращается в UPPER(name) LIKE '%...%', такой
+    # запрос может использовать только триграммный индекс PostgreSQL.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX title_name_trgm_idx ON reviews_title '
+            'USING gin (UPPER(name::text) gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    schema_editor.execute('DROP INDEX IF EXISTS title_genre_genre_title_idx')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS title_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_queuedmail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-year'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-year'], name='title_category_year_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 3.2 on 2026-10-18 18:04
+
+from django.db import migrations, models
+
+# rowid = object_id * 4 + код типа (1 — title, 2 — review, 3 — comment).
+FILL_SQL = (
+    "INSERT INTO search_index "
+    "(rowid, kind, object_id, title_id, review_id, body) "
+    "SELECT id * 4 + 1, 'title', id, id, NULL, name || ' ' || description "
+    "FROM reviews_title",
+    "INSERT INTO search_index "
+    "(rowid, kind, object_id, title_id, review_id, body) "
+    "SELECT id * 4 + 2, 'review', id, title_id, NULL, text "
+    "FROM reviews_review",
+    "INSERT INTO search_index "
+    "(rowid, kind, object_id, title_id, review_id, body) "
+    "SELECT c.id * 4 + 3, 'comment', c.id, r.title_id, c.review_id, c.text "
+    "FROM reviews_comment c JOIN reviews_review r ON r.id = c.review_id",
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE search_index ('
+            'rowid bigint PRIMARY KEY, kind varchar(16) NOT NULL, '
+            'object_id bigint NOT NULL, title_id bigint NULL, '
+            'review_id bigint NULL, body text NOT NULL, '
+            "document tsvector GENERATED ALWAYS AS "
+            "(to_tsvector('simple', body)) STORED)"
+        )
+        schema_editor.execute(
+            'CREATE INDEX search_index_document_idx '
+            'ON search_index USING gin (document)'
+        )
+    else:
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE search_index USING fts5('
+            'kind UNINDEXED, object_id UNINDEXED, title_id UNINDEXED, '
+            "review_id UNINDEXED, body, tokenize='unicode61')"
+        )
+    for sql in FILL_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    schema_editor.execute('DROP TABLE search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_search_index, drop_search_index),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='SearchEntry',
+                    fields=[
+                        ('rowid', models.BigIntegerField(primary_key=True, serialize=False)),
+                        ('kind', models.CharField(max_length=16)),
+                        ('object_id', models.BigIntegerField()),
+                        ('title_id', models.BigIntegerField(null=True)),
+                        ('review_id', models.BigIntegerField(null=True)),
+                        ('body', models.TextField()),
+                    ],
+                    options={
+                        'verbose_name': 'Запись поискового индекса',
+                        'verbose_name_plural': 'Поисковый индекс',
+                        'db_table': 'search_index',
+                    },
+                ),
+            ],
+        ),
+    ]
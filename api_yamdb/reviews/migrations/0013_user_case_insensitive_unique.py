@@ -0,0 +1,24 @@
+from django.db import migrations
+
+# Django 3.2 не умеет описывать уникальные ограничения по выражениям
+# (UniqueConstraint(Lower(...)) появились в 4.0), поэтому индексы
+# создаются SQL, одинаковым для SQLite и PostgreSQL.
+INDEXES = (
+    ('user_username_lower_uniq', 'username'),
+    ('user_email_lower_uniq', 'email'),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_review_comments_count'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f'CREATE UNIQUE INDEX {name} ON reviews_user (LOWER({column}));',
+            f'DROP INDEX {name};'
+        )
+        for name, column in INDEXES
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2 on 2026-10-18 18:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# SQLite пересоздаёт таблицу при удалении колонки и теряет индексы по
+# выражениям из 0013 — восстанавливаем их после RemoveField (и после
+# обратного AddField при откате).
+RESTORE_INDEXES = [
+    f'CREATE UNIQUE INDEX IF NOT EXISTS {name} '
+    f'ON reviews_user (LOWER({column}));'
+    for name, column in (
+        ('user_username_lower_uniq', 'username'),
+        ('user_email_lower_uniq', 'email'),
+    )
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_user_case_insensitive_unique'),
+    ]
+
+    operations = [
+        migrations.RunSQL(migrations.RunSQL.noop, RESTORE_INDEXES),
+        migrations.CreateModel(
+            name='ConfirmationCode',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='confirmation', serialize=False, to='reviews.user')),
+                ('code_hash', models.CharField(max_length=64)),
+                ('expires', models.DateTimeField(db_index=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Код подтверждения',
+                'verbose_name_plural': 'Коды подтверждения',
+            },
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='confirmation_code',
+        ),
+        migrations.RunSQL(RESTORE_INDEXES, migrations.RunSQL.noop),
+    ]
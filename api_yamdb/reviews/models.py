@@ -2,9 +2,12 @@ from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, Q, Subquery
+from django.db.models.functions import Lower
+from django.utils import timezone
 
-from .constants import ADMIN, CODE_LENGTH, MODERATOR, USER, ROLE_CHOICES
+from .constants import ADMIN, MODERATOR, USER, ROLE_CHOICES
 from .validators import validate_year
 
 
@@ -28,7 +31,6 @@ class CustomUserManager(BaseUserManager):
         user = self.model(
             username=username,
             email=self.normalize_email(email),
-            confirmation_code=self.make_random_password(length=CODE_LENGTH),
             password=password,
             role=role,
             bio=bio,
@@ -39,6 +41,29 @@ class CustomUserManager(BaseUserManager):
 
         return user
 
+    def find_for_signup(self, username, email):
+        """Пользователи с таким username или email, без учёта регистра.
+
+        Условия совпадают с уникальными индексами по LOWER(username) и
+        LOWER(email), так что это один индексный запрос и не больше двух
+        строк.
+        """
+        return list(
+            self.alias(
+                username_lower=Lower('username'), email_lower=Lower('email')
+            ).filter(
+                Q(username_lower=username.lower())
+                | Q(email_lower=email.lower())
+            ).only('id', 'username', 'email')[:2]
+        )
+
+    def find_for_token(self, username, fields):
+        """Пользователь с таким username без учёта регистра, как при
+        регистрации; один запрос по индексу LOWER(username)."""
+        return self.alias(username_lower=Lower('username')).filter(
+            username_lower=username.lower()
+        ).only(*fields).first()
+
     def create_superuser(
         self,
         username,
@@ -61,14 +86,16 @@ class CustomUserManager(BaseUserManager):
             first_name=first_name,
             last_name=last_name
         )
+        from core import confirmation_codes
+
         user.is_superuser = True
         user.is_staff = True
-        user.email_user(
+        user.save()
+        QueuedMail.objects.enqueue(
             subject='confirmation_code',
-            message=user.confirmation_code,
-            fail_silently=False
+            message=confirmation_codes.issue(user),
+            recipient=user.email
         )
-        user.save()
 
         return user
 
@@ -81,7 +108,6 @@ class User(AbstractUser):
         choices=ROLE_CHOICES,
         default='user',
     )
-    confirmation_code = models.CharField(max_length=CODE_LENGTH, blank=True, )
 
     objects = CustomUserManager()
 
@@ -96,6 +122,12 @@ class User(AbstractUser):
             )
         ]
 
+    def matches_signup(self, username, email):
+        return (
+            self.username.lower() == username.lower()
+            and self.email.lower() == email.lower()
+        )
+
     @property
     def is_user(self):
         return self.role == USER
@@ -112,6 +144,31 @@ class User(AbstractUser):
         return self.username
 
 
+class ConfirmationCode(models.Model):
+    """Код подтверждения пользователя, см. core.confirmation_codes.
+
+    Хранится только SHA-256 кода; запись удаляется при выдаче токена,
+    иначе живёт до expires, после CONFIRMATION_CODE_MAX_ATTEMPTS
+    неудачных попыток код не принимается.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='confirmation'
+    )
+    code_hash = models.CharField(max_length=64)
+    expires = models.DateTimeField(db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    def __str__(self):
+        return str(self.user_id)
+
+
 class Category(models.Model):
     name = models.CharField(
         verbose_name='Название',
@@ -182,8 +239,26 @@ class Title(models.Model):
         related_name='titles'
     )
 
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False
+    )
+
     class Meta:
         ordering = ['-year', ]
+        indexes = [
+            models.Index(fields=('-year',), name='title_year_idx'),
+            models.Index(
+                fields=('category', '-year'), name='title_category_year_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['name', 'year'],
@@ -195,6 +270,20 @@ class Title(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @classmethod
+    def update_rating(cls, title_id, score_delta, count_delta=0):
+        """Атомарно сдвигает сумму и количество оценок произведения."""
+        cls.objects.filter(pk=title_id).update(
+            rating_sum=F('rating_sum') + score_delta,
+            rating_count=F('rating_count') + count_delta
+        )
+
 
 class Review(models.Model):
     text = models.TextField()
@@ -209,11 +298,22 @@ class Review(models.Model):
         related_name='reviews'
     )
     pub_date = models.DateTimeField(auto_now_add=True)
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         ordering = ['pub_date']
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=('title', 'author'),
@@ -224,6 +324,146 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    @classmethod
+    def locked_score(cls, review_id, using):
+        """Оценка отзыва под блокировкой строки до конца транзакции.
+
+        Параллельное изменение того же отзыва ждёт коммита и читает уже
+        новую оценку, так что рейтинг не сдвигается дважды. SQLite не
+        умеет SELECT ... FOR UPDATE: блокировку записи там берёт пустой
+        UPDATE.
+        """
+        queryset = cls.objects.using(using).filter(pk=review_id)
+        if transaction.get_connection(using).features.has_select_for_update:
+            queryset = queryset.select_for_update()
+        else:
+            queryset.update(score=F('score'))
+        return queryset.values_list('score', flat=True).first()
+
+    @classmethod
+    def update_comments_count(cls, review_id, delta):
+        """Атомарно сдвигает счётчик комментариев отзыва."""
+        cls.objects.filter(pk=review_id).update(
+            comments_count=F('comments_count') + delta
+        )
+
+
+class TitleStats(models.Model):
+    """Гистограмма оценок и дата последнего отзыва произведения.
+
+    Количество и сумма оценок хранятся в Title.rating_count и
+    Title.rating_sum. Строка создаётся при первом изменении отзывов
+    произведения; её отсутствие означает, что отзывов нет. Отзывы,
+    созданные через bulk_create, учитывает только rebuild().
+    """
+    SCORES = range(1, 11)
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    score_1 = models.PositiveIntegerField(
+        verbose_name='Оценок 1', default=0
+    )
+    score_2 = models.PositiveIntegerField(
+        verbose_name='Оценок 2', default=0
+    )
+    score_3 = models.PositiveIntegerField(
+        verbose_name='Оценок 3', default=0
+    )
+    score_4 = models.PositiveIntegerField(
+        verbose_name='Оценок 4', default=0
+    )
+    score_5 = models.PositiveIntegerField(
+        verbose_name='Оценок 5', default=0
+    )
+    score_6 = models.PositiveIntegerField(
+        verbose_name='Оценок 6', default=0
+    )
+    score_7 = models.PositiveIntegerField(
+        verbose_name='Оценок 7', default=0
+    )
+    score_8 = models.PositiveIntegerField(
+        verbose_name='Оценок 8', default=0
+    )
+    score_9 = models.PositiveIntegerField(
+        verbose_name='Оценок 9', default=0
+    )
+    score_10 = models.PositiveIntegerField(
+        verbose_name='Оценок 10', default=0
+    )
+    last_review = models.DateTimeField(
+        verbose_name='Последний отзыв', null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Статистика произведения'
+        verbose_name_plural = 'Статистика произведений'
+
+    def __str__(self):
+        return str(self.title_id)
+
+    @property
+    def histogram(self):
+        return {
+            score: getattr(self, f'score_{score}') for score in self.SCORES
+        }
+
+    @classmethod
+    def record(cls, title_id, added=None, removed=None, pub_date=None):
+        """Атомарно переносит отзыв между корзинами гистограммы.
+
+        added — оценка нового или изменённого отзыва, removed — прежняя
+        оценка изменённого или удалённого. Вызывается сигналами после
+        сохранения или удаления отзыва.
+        """
+        changes = {}
+        if added is not None:
+            changes[f'score_{added}'] = F(f'score_{added}') + 1
+        if removed is not None:
+            changes[f'score_{removed}'] = F(f'score_{removed}') - 1
+        if pub_date is not None:
+            changes['last_review'] = pub_date
+        elif added is None:
+            changes['last_review'] = Subquery(
+                Review.objects.filter(title_id=title_id)
+                .order_by('-pub_date').values('pub_date')[:1]
+            )
+        updated = cls.objects.filter(title_id=title_id).update(**changes)
+        # Без строки вычитать не из чего: её ещё нет или она удалена
+        # вместе с произведением каскадом.
+        if not updated and removed is None:
+            # Первый отзыв: создаём пустую строку. ignore_conflicts
+            # (ON CONFLICT DO NOTHING) не даёт параллельному первому
+            # отзыву упасть на первичном ключе.
+            cls.objects.bulk_create(
+                [cls(title_id=title_id)], ignore_conflicts=True
+            )
+            cls.objects.filter(title_id=title_id).update(**changes)
+
+    @classmethod
+    def rebuild(cls, title_ids=None):
+        """Пересчитывает статистику по отзывам; возвращает число строк."""
+        reviews = Review.objects.order_by()
+        if title_ids is not None:
+            reviews = reviews.filter(title_id__in=title_ids)
+        stats = {}
+        for title_id, last_review in reviews.values_list(
+                'title_id').annotate(Max('pub_date')):
+            stats[title_id] = cls(title_id=title_id, last_review=last_review)
+        for title_id, score, count in reviews.values_list(
+                'title_id', 'score').annotate(Count('id')):
+            setattr(stats[title_id], f'score_{score}', count)
+        with transaction.atomic():
+            deleted = cls.objects.all()
+            if title_ids is not None:
+                deleted = deleted.filter(title_id__in=title_ids)
+            deleted.delete()
+            cls.objects.bulk_create(stats.values(), batch_size=1000)
+        return len(stats)
+
 
 class Comment(models.Model):
     text = models.TextField()
@@ -241,6 +481,113 @@ class Comment(models.Model):
         ordering = ['pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text
+
+
+class QueuedMailManager(models.Manager):
+    def enqueue(self, subject, message, recipient):
+        """Ставит письмо в очередь и будит отправщика после коммита."""
+        from core.mail_queue import notify
+
+        mail = self.create(
+            subject=subject, message=message, recipient=recipient
+        )
+        transaction.on_commit(notify)
+        return mail
+
+
+class QueuedMail(models.Model):
+    subject = models.CharField(max_length=256)
+    message = models.TextField()
+    recipient = models.EmailField()
+    created = models.DateTimeField(auto_now_add=True)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    sent = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    objects = QueuedMailManager()
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [
+            models.Index(
+                fields=('sent', 'next_attempt'),
+                name='queued_mail_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+
+class SearchEntry(models.Model):
+    """Строка полнотекстового индекса.
+
+    Таблица создаётся миграцией: в SQLite это виртуальная таблица FTS5,
+    в PostgreSQL — обычная таблица с tsvector и GIN-индексом.
+    """
+    TITLE = 1
+    REVIEW = 2
+    COMMENT = 3
+    KINDS = {TITLE: 'title', REVIEW: 'review', COMMENT: 'comment'}
+
+    rowid = models.BigIntegerField(primary_key=True)
+    kind = models.CharField(max_length=16)
+    object_id = models.BigIntegerField()
+    title_id = models.BigIntegerField(null=True)
+    review_id = models.BigIntegerField(null=True)
+    body = models.TextField()
+
+    class Meta:
+        db_table = 'search_index'
+        verbose_name = 'Запись поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}'
+
+    @classmethod
+    def make_rowid(cls, kind, object_id):
+        return object_id * 4 + kind
+
+    @classmethod
+    def for_title(cls, title):
+        return cls(
+            rowid=cls.make_rowid(cls.TITLE, title.id),
+            kind=cls.KINDS[cls.TITLE],
+            object_id=title.id,
+            title_id=title.id,
+            body=f'{title.name} {title.description}'
+        )
+
+    @classmethod
+    def for_review(cls, review):
+        return cls(
+            rowid=cls.make_rowid(cls.REVIEW, review.id),
+            kind=cls.KINDS[cls.REVIEW],
+            object_id=review.id,
+            title_id=review.title_id,
+            body=review.text
+        )
+
+    @classmethod
+    def for_comment(cls, comment):
+        return cls(
+            rowid=cls.make_rowid(cls.COMMENT, comment.id),
+            kind=cls.KINDS[cls.COMMENT],
+            object_id=comment.id,
+            title_id=comment.review.title_id,
+            review_id=comment.review_id,
+            body=comment.text
+        )
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,20 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def eager_mail_queue(settings):
+    settings.MAIL_QUEUE_EAGER = True
+
+
+@pytest.fixture(autouse=True)
+def no_code_sweeper(settings):
+    settings.CONFIRMATION_CODE_SWEEP_INTERVAL = 0
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
@@ -0,0 +1,57 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_reviews(self, client, admin_client,
+                                       user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+
+        create_single_review(user_client, title_id, 'Неплохо', 4)
+        response = create_single_review(
+            moderator_client, title_id, 'Отлично', 9
+        )
+        assert self.get_rating(client, title_id) == 6, (
+            'Проверьте, что после создания отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+        review_id = response.json()['id']
+        moderator_client.patch(f'{url}{review_id}/', data={'score': 10})
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что после изменения оценки в отзыве рейтинг '
+            'произведения пересчитывается.'
+        )
+
+        moderator_client.delete(f'{url}{review_id}/')
+        assert self.get_rating(client, title_id) == 4, (
+            'Проверьте, что после удаления отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+    def test_02_rebuild_ratings(self, client, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Неплохо', 8)
+        Title.objects.filter(pk=title_id).update(rating_sum=0, rating_count=0)
+
+        call_command('rebuild_ratings')
+        assert self.get_rating(client, title_id) == 8, (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'рейтинги произведений по отзывам.'
+        )
@@ -0,0 +1,145 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (create_comments, create_single_comment,
+                         create_single_review, create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    def test_01_titles_list_and_detail(self, client, admin_client,
+                                       django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+
+        # count + titles with categories + genres prefetch
+        with django_assert_max_num_queries(3):
+            client.get(url)
+        with django_assert_max_num_queries(3):
+            client.get(f'{url}?genre=comedy')
+        with django_assert_max_num_queries(2):
+            client.get(f'{url}{titles[0]["id"]}/')
+
+    def test_02_reviews_and_comments(self, client, admin_client, admin,
+                                     user_client, user, moderator_client,
+                                     moderator,
+                                     django_assert_max_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        # user + title + begin + savepoint + insert + search index
+        # + release + rating + stats
+        with django_assert_max_num_queries(9):
+            create_single_review(moderator_client, titles[0]['id'], 'Да', 7)
+        # title + count + reviews with authors
+        with django_assert_max_num_queries(3):
+            client.get(url)
+        with django_assert_max_num_queries(1):
+            client.get(f'{url}{reviews[0]["id"]}/')
+
+        url = f'{url}{reviews[0]["id"]}/comments/'
+        # review + begin + insert + search index + comments_count
+        with django_assert_max_num_queries(5):
+            create_single_comment(moderator_client, titles[0]['id'],
+                                  reviews[0]['id'], 'Нет')
+        # review + count + comments with authors
+        with django_assert_max_num_queries(3):
+            client.get(url)
+
+    def test_03_permissions_from_token_claims(self, admin, user,
+                                              django_assert_num_queries):
+        from rest_framework.test import APIClient
+
+        from core.jwt_authentication import RoleAccessToken
+
+        clients = {}
+        for role_user in (admin, user):
+            clients[role_user] = APIClient()
+            clients[role_user].credentials(
+                HTTP_AUTHORIZATION=(
+                    f'Bearer {RoleAccessToken.for_user(role_user)}'
+                )
+            )
+
+        # Состояние пользователя для сверки claims кэшируется при первом
+        # запросе, дальше права проверяются без БД.
+        for client in clients.values():
+            client.get('/api/v1/categories/')
+        with django_assert_num_queries(0):
+            response = clients[user].post('/api/v1/categories/', data={})
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что права доступа проверяются по claims токена.'
+        )
+        with django_assert_num_queries(0):
+            response = clients[admin].post('/api/v1/genres/', data={})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_author_permissions(self, admin_client, admin, user_client,
+                                   user, django_assert_max_num_queries):
+        from rest_framework.test import APIClient
+
+        from core import jwt_authentication
+
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=(
+            f'Bearer {jwt_authentication.RoleAccessToken.for_user(user)}'
+        ))
+        review = next(
+            review for review in reviews if review['author'] == user.username
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+        client.get(url)
+        # Автор сравнивается по author_id: ни он, ни текущий пользователь
+        # не загружаются, даже если кэш пользователей пуст.
+        jwt_authentication._user_cache.clear()
+        # review + begin + блокировка и чтение оценки (в SQLite пустой
+        # UPDATE и SELECT) + update + search index (delete, insert)
+        with django_assert_max_num_queries(7):
+            response = client.patch(url, data={'text': 'Новый текст'})
+        assert response.status_code == HTTPStatus.OK
+
+        comment = next(
+            comment for comment in comments
+            if comment['author'] == user.username
+        )
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/{comment["id"]}/')
+        jwt_authentication._user_cache.clear()
+        # comment + begin + delete + search index + comments_count
+        with django_assert_max_num_queries(5):
+            response = client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_05_stale_token_claims(self, admin, moderator, user):
+        from rest_framework.test import APIClient
+
+        from core.jwt_authentication import RoleAccessToken
+
+        clients = {}
+        for role_user in (admin, moderator, user):
+            clients[role_user] = APIClient()
+            clients[role_user].credentials(
+                HTTP_AUTHORIZATION=(
+                    f'Bearer {RoleAccessToken.for_user(role_user)}'
+                )
+            )
+            clients[role_user].get('/api/v1/genres/')
+
+        admin.role = 'user'
+        admin.save()
+        moderator.is_active = False
+        moderator.save()
+        user.delete()
+        for role_user, client in clients.items():
+            response = client.post('/api/v1/genres/', data={
+                'name': 'Жанр', 'slug': f'genre-{role_user.pk}'
+            })
+            assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+                'Проверьте, что токен отклоняется, если пользователя '
+                'удалили, заблокировали или изменили его роль.'
+            )
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def walk(self, client, url):
+        results = []
+        pages = 0
+        while url:
+            pages += 1
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` в курсорном режиме '
+                'пагинации возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в курсорном режиме пагинации не '
+                'подсчитывается общее количество объектов.'
+            )
+            results.extend(data['results'])
+            url = data['next']
+        assert pages > 1
+        return results
+
+    def test_01_reviews_and_comments(self, client, admin_client, admin,
+                                     user_client, user, moderator_client,
+                                     moderator, monkeypatch):
+        from api.paginations import PubDateCursorPagination
+
+        monkeypatch.setattr(PubDateCursorPagination, 'page_size', 2)
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        results = self.walk(client, f'{url}?pagination=cursor')
+        assert [review['id'] for review in results] == [
+            review['id'] for review in reviews
+        ], (
+            f'Проверьте, что `{url}?pagination=cursor` возвращает все отзывы '
+            'в порядке публикации.'
+        )
+
+        url = f'{url}{reviews[0]["id"]}/comments/'
+        results = self.walk(client, f'{url}?pagination=cursor')
+        assert [comment['id'] for comment in results] == [
+            comment['id'] for comment in comments
+        ], (
+            f'Проверьте, что `{url}?pagination=cursor` возвращает все '
+            'комментарии в порядке публикации.'
+        )
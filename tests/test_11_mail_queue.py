@@ -0,0 +1,33 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11MailQueue:
+
+    def test_01_signup_mail_is_queued(self, client, settings, monkeypatch):
+        from reviews.models import QueuedMail
+
+        settings.MAIL_QUEUE_EAGER = False
+        monkeypatch.setattr('core.mail_queue.notify', lambda: None)
+        outbox_before_count = len(mail.outbox)
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+
+        client.post('/api/v1/auth/signup/', data=data)
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что письмо с кодом подтверждения не отправляется '
+            'во время обработки запроса.'
+        )
+        assert QueuedMail.objects.filter(
+            recipient=data['email'], sent__isnull=True
+        ).exists(), (
+            'Проверьте, что письмо с кодом подтверждения ставится в очередь.'
+        )
+
+        call_command('send_mail_queue', '--once')
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert data['email'] in mail.outbox[-1].to
+        assert not QueuedMail.objects.filter(sent__isnull=True).exists(), (
+            'Проверьте, что отправленные письма отмечаются в очереди.'
+        )
@@ -0,0 +1,49 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12CatalogCache:
+
+    def test_01_etag_and_invalidation(self, client, admin_client, user_client,
+                                      django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        for url in ('/api/v1/categories/', '/api/v1/genres/',
+                    '/api/v1/titles/'):
+            response = client.get(url)
+            etag = response['ETag']
+            with django_assert_num_queries(0):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+            with django_assert_num_queries(0):
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response['ETag'] == etag
+
+        url = '/api/v1/genres/'
+        etag = client.get(url)['ETag']
+        admin_client.post(url, data={'name': 'Вестерн', 'slug': 'western'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что кэш `{url}` сбрасывается при создании жанра.'
+        )
+        assert 'western' in {genre['slug'] for genre in response.json()['results']}
+
+        url = '/api/v1/titles/'
+        etag = client.get(url)['ETag']
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 10)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что кэш `{url}` сбрасывается при появлении отзыва.'
+        )
+        ratings = {
+            title['id']: title['rating']
+            for title in response.json()['results']
+        }
+        assert ratings[titles[0]['id']] == 10
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Search:
+    url = '/api/v1/search/'
+
+    def search(self, client, query, **params):
+        response = client.get(self.url, data={'q': query, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` со строкой поиска '
+            'возвращает ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_01_search(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[1]['id'], 'Орешек оказался крепким', 9
+        ).json()
+        comment = create_single_comment(
+            user_client, titles[1]['id'], review['id'], 'Крепкий отзыв'
+        ).json()
+
+        data = self.search(client, 'креп')
+        assert data['count'] == 3, (
+            'Проверьте, что поиск находит произведения, отзывы и '
+            'комментарии по началу слова без учёта регистра.'
+        )
+        found = {(item['type'], item['id']) for item in data['results']}
+        assert found == {
+            ('title', titles[1]['id']),
+            ('review', review['id']),
+            ('comment', comment['id']),
+        }
+
+        data = self.search(client, 'крепкий', type='comment')
+        assert [item['id'] for item in data['results']] == [comment['id']]
+        assert data['results'][0]['review_id'] == review['id']
+        assert data['results'][0]['title_id'] == titles[1]['id']
+
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert self.search(client, 'креп')['count'] == 0, (
+            'Проверьте, что удалённые объекты исчезают из поиска.'
+        )
+
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
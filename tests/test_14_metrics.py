@@ -0,0 +1,41 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Metrics:
+    url = '/api/v1/metrics/'
+
+    def test_01_server_timing_and_metrics(self, client, user_client,
+                                          admin_client):
+        response = client.get('/api/v1/titles/')
+        assert 'db;dur=' in response['Server-Timing'], (
+            'Проверьте, что ответы содержат заголовок `Server-Timing` '
+            'с временем работы с БД.'
+        )
+        assert 'serialize;dur=' in response['Server-Timing'], (
+            'Проверьте, что `Server-Timing` содержит время сериализации.'
+        )
+
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.url}` доступен только администратору.'
+        )
+
+        response = admin_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        body = response.content.decode()
+        assert (
+            'yamdb_request_duration_seconds_count'
+            '{route="titles-list",method="GET"}'
+        ) in body, (
+            f'Проверьте, что `{self.url}` отдаёт гистограммы по маршрутам.'
+        )
+        assert (
+            'yamdb_serialize_duration_seconds_count'
+            '{route="titles-list",method="GET"} 1'
+        ) in body, (
+            f'Проверьте, что `{self.url}` отдаёт гистограмму времени '
+            'сериализации.'
+        )
@@ -0,0 +1,59 @@
+import pytest
+from django.test import RequestFactory
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ReplicaRouter:
+
+    def test_01_routing(self, settings, user):
+        from core.db.routers import (ReplicaRouter, current_request,
+                                     pin_to_primary)
+
+        settings.DATABASE_REPLICAS = ['replica1']
+        router = ReplicaRouter()
+        factory = RequestFactory()
+
+        assert router.db_for_read(None) == 'default', (
+            'Проверьте, что чтения вне HTTP-запроса идут в `default`.'
+        )
+        for method, expected in (('get', 'replica1'), ('post', 'default')):
+            request = getattr(factory, method)('/api/v1/titles/')
+            token = current_request.set(request)
+            try:
+                assert router.db_for_read(None) == expected, (
+                    f'Проверьте маршрутизацию чтений {method.upper()}-запроса.'
+                )
+            finally:
+                current_request.reset(token)
+        assert router.db_for_write(None) == 'default'
+
+        request = factory.get('/api/v1/titles/')
+        request.user = user
+        pin_to_primary(user)
+        token = current_request.set(request)
+        try:
+            assert router.db_for_read(None) == 'default', (
+                'Проверьте, что пользователь после записи читает из `default`.'
+            )
+        finally:
+            current_request.reset(token)
+
+    def test_02_pin_cache_alias(self, settings, user):
+        from django.core.cache import caches
+
+        from core.db.routers import pin_key, pin_to_primary
+
+        settings.CACHES = {
+            **settings.CACHES,
+            'shared': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'replica-pins',
+            },
+        }
+        settings.REPLICA_PIN_CACHE = 'shared'
+        pin_to_primary(user)
+        assert caches['shared'].get(pin_key(user)), (
+            'Проверьте, что отметка чтения из `default` хранится в кэше '
+            '`REPLICA_PIN_CACHE`.'
+        )
+        assert caches['default'].get(pin_key(user)) is None
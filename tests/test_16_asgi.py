@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from django.test import AsyncClient, Client
+
+from .utils import create_categories, create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Asgi:
+
+    def test_01_async_views(self, settings):
+        from django.urls import resolve
+
+        settings.ROOT_URLCONF = 'api_yamdb.asgi_urls'
+        for path in (
+            '/api/v1/titles/',
+            '/api/v1/titles/1/',
+            '/api/v1/titles/1/reviews/',
+            '/api/v1/titles/1/reviews/1/comments/1/',
+        ):
+            assert asyncio.iscoroutinefunction(resolve(path).func), (
+                f'Проверьте, что под ASGI `{path}` обслуживает '
+                'асинхронное представление.'
+            )
+        assert not asyncio.iscoroutinefunction(
+            resolve('/api/v1/categories/').func
+        )
+
+    def test_02_same_response(self, settings, admin_client, admin):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client}
+        )
+        paths = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/',
+        )
+        expected = [Client().get(path).content for path in paths]
+
+        settings.ROOT_URLCONF = 'api_yamdb.asgi_urls'
+
+        async def fetch():
+            client = AsyncClient()
+            return await asyncio.gather(
+                *(client.get(path) for path in paths)
+            )
+
+        responses = asyncio.run(fetch())
+        for path, response, content in zip(paths, responses, expected):
+            assert response.status_code == 200, (
+                f'Проверьте, что под ASGI `{path}` доступен.'
+            )
+            assert response.content == content, (
+                f'Проверьте, что под ASGI `{path}` отдаёт тот же ответ.'
+            )
+            assert 'queries' in response['Server-Timing'], (
+                'Проверьте, что под ASGI запросы к БД учитываются в метриках.'
+            )
+
+    def test_03_benchmark_smoke(self):
+        import subprocess
+        import sys
+
+        from .conftest import MANAGE_PATH
+
+        # Команда создаёт свою временную базу, поэтому запускается
+        # отдельным процессом, а не внутри тестовой базы pytest.
+        result = subprocess.run(
+            [sys.executable, 'manage.py', 'benchmark_api',
+             '--interface', 'both', '--requests', '4', '--concurrency', '2',
+             '--users', '3', '--titles', '3', '--genres', '2',
+             '--categories', '1', '--reviews-per-title', '2'],
+            cwd=MANAGE_PATH, capture_output=True, text=True, timeout=300
+        )
+        assert result.returncode == 0, result.stderr
+        lines = result.stdout.splitlines()
+        header = next(
+            i for i, line in enumerate(lines) if line.startswith('сценарий')
+        )
+        rows = [line.split() for line in lines[header + 1:]]
+        names = {row[0] for row in rows}
+        assert {
+            'search@asgi', 'auth-token@asgi', 'reviews-create@asgi',
+            'comments-delete@asgi', 'titles-bulk-update@asgi',
+        } <= names, result.stdout
+        errors = {row[0]: int(row[-1]) for row in rows}
+        assert not any(errors.values()), (
+            'Проверьте, что сценарии benchmark_api выполняются без ошибок '
+            f'под WSGI и ASGI: {errors}'
+        )
+
+    def test_04_sync_view_queries(self, settings, admin_client):
+        from django.urls import resolve
+
+        create_categories(admin_client)
+        settings.ROOT_URLCONF = 'api_yamdb.asgi_urls'
+        assert not asyncio.iscoroutinefunction(
+            resolve('/api/v1/categories/').func
+        )
+
+        async def fetch():
+            return await AsyncClient().get('/api/v1/categories/')
+
+        response = asyncio.run(fetch())
+        assert response.status_code == 200
+        assert '"0 queries"' not in response['Server-Timing'], (
+            'Проверьте, что под ASGI запросы к БД синхронных представлений '
+            'учитываются в метриках.'
+        )
@@ -0,0 +1,41 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17RowSerializers:
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_01_byte_identical(self, admin_client, admin, user_client, user):
+        from api.row_serializers import (CommentRowSerializer,
+                                         ReviewRowSerializer,
+                                         TitleRowSerializer)
+        from api.serializers import (CommentSerializer, ReviewSerializer,
+                                     TitleGetSerializer)
+        from api.views import TitleViewSet
+        from reviews.models import Comment, Review, Title
+
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        # Произведение без категории и оценок.
+        Title.objects.create(name='Без категории', year=2001)
+        cases = (
+            (TitleViewSet.queryset.all(), TitleGetSerializer,
+             TitleRowSerializer),
+            (Review.objects.select_related('author'), ReviewSerializer,
+             ReviewRowSerializer),
+            (Comment.objects.select_related('author'), CommentSerializer,
+             CommentRowSerializer),
+        )
+        for queryset, serializer_class, row_serializer_class in cases:
+            expected = self.render(
+                serializer_class(queryset.order_by('id'), many=True).data
+            )
+            rows = row_serializer_class.get_values(queryset.order_by('id'))
+            assert self.render(row_serializer_class(rows).data) == expected, (
+                f'Проверьте, что `{row_serializer_class.__name__}` выдаёт '
+                f'тот же JSON, что и `{serializer_class.__name__}`.'
+            )
@@ -0,0 +1,96 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_titles
+
+DATA = {
+    'count': 4,
+    'next': None,
+    'results': [
+        {'name': 'Фильм', 'year': 1994, 'rating': None},
+        {'date': datetime(2023, 3, 14, 17, 36, tzinfo=timezone.utc)},
+        {'price': Decimal('1.50'), 'tags': ['а', 'b']},
+        {'text': 'строка\u2028абзац\u2029конец'},
+    ],
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18FastJSON:
+
+    @pytest.mark.parametrize('with_orjson', (True, False))
+    def test_01_renderer(self, with_orjson, monkeypatch):
+        from api import renderers
+
+        if not with_orjson:
+            monkeypatch.setattr(renderers, 'orjson', None)
+        renderer = renderers.FastJSONRenderer()
+        expected = JSONRenderer().render(DATA)
+        assert renderer.render(DATA) == expected, (
+            'Проверьте, что `FastJSONRenderer` выдаёт тот же JSON, что и '
+            '`JSONRenderer` DRF.'
+        )
+        assert b''.join(renderer.iter_render(DATA)) == expected, (
+            'Проверьте, что потоковый рендеринг выдаёт тот же JSON.'
+        )
+        assert b''.join(renderer.iter_render(DATA['results'])) == (
+            JSONRenderer().render(DATA['results'])
+        )
+
+    def test_02_streaming(self, client, admin_client, monkeypatch, settings):
+        from api.renderers import FastJSONRenderer
+
+        titles, _, _ = create_titles(admin_client)
+        expected = client.get('/api/v1/titles/').json()
+        assert not client.get('/api/v1/titles/').streaming
+        settings.FAST_JSON_STREAM_THRESHOLD = 1
+        monkeypatch.setattr(FastJSONRenderer, 'chunk_size', 1)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что большие списки отдаются потоком.'
+        )
+        assert response['ETag']
+        data = json.loads(b''.join(response.streaming_content))
+        assert data['count'] == expected['count'] == 2
+        assert len(data['results']) == 2
+
+        response = admin_client.patch(
+            '/api/v1/titles/bulk/',
+            data=json.dumps([
+                {'id': title['id'], 'year': 2000} for title in titles
+            ]),
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что ответ пакетного PATCH длиннее '
+            '`FAST_JSON_STREAM_THRESHOLD` отдаётся потоком.'
+        )
+        data = json.loads(b''.join(response.streaming_content))
+        assert [title['year'] for title in data] == [2000, 2000]
+
+    def test_03_parser(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.post(
+            '/api/v1/titles/',
+            data=json.dumps({
+                'name': 'Поезд на Юму', 'year': 1957,
+                'genre': ['horror'], 'category': 'films'
+            }),
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что `FastJSONParser` разбирает JSON-запросы.'
+        )
+        response = admin_client.post(
+            '/api/v1/titles/', data='{"name": ',
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'JSON parse error' in response.json()['detail']
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleStats:
+
+    def get_stats(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/stats/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            '`/api/v1/titles/{title_id}/stats/` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response.json()
+
+    def test_01_incremental(self, client, admin_client, admin, user_client,
+                            user, moderator_client, moderator):
+        from django.core.management import call_command
+        from reviews.models import TitleStats
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        empty = self.get_stats(client, titles[1]['id'])
+        assert empty['count'] == 0 and empty['last_review'] is None
+        assert set(empty['histogram'].values()) == {0}
+
+        response = create_single_review(
+            moderator_client, title_id, 'Отзыв', 7
+        )
+        last_review = response.json()['pub_date']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        admin_client.patch(f'{url}{reviews[0]["id"]}/', data={'score': 9})
+        admin_client.delete(f'{url}{reviews[1]["id"]}/')
+
+        stats = self.get_stats(client, title_id)
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'7': 1, '9': 1})
+        assert stats['histogram'] == expected, (
+            'Проверьте, что гистограмма оценок обновляется при создании, '
+            'изменении и удалении отзывов.'
+        )
+        assert (stats['count'], stats['sum'], stats['rating']) == (2, 16, 8)
+        assert stats['last_review'] == last_review
+
+        admin_client.delete(f'{url}{response.json()["id"]}/')
+        stats = self.get_stats(client, title_id)
+        assert stats['last_review'] != last_review, (
+            'Проверьте, что после удаления последнего отзыва дата '
+            'последнего отзыва пересчитывается.'
+        )
+        TitleStats.objects.all().delete()
+        call_command('rebuild_ratings', stdout=StringIO())
+        assert self.get_stats(client, title_id) == stats, (
+            'Проверьте, что `rebuild_ratings` пересчитывает статистику.'
+        )
+
+    def test_02_cascade_delete(self, client, admin_client, admin,
+                               user_client, user, moderator_client,
+                               moderator):
+        from reviews.models import Review
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        create_single_review(moderator_client, title_id, 'Отзыв', 7)
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        stats = self.get_stats(client, title_id)
+        assert (stats['count'], stats['sum']) == (2, 12), (
+            'Проверьте, что рейтинг пересчитывается, когда отзывы '
+            'удаляются вместе с автором.'
+        )
+        assert (stats['histogram']['5'], stats['histogram']['7']) == (1, 1)
+        title = client.get(f'/api/v1/titles/{title_id}/').json()
+        assert title['rating'] == 6
+
+        Review.objects.filter(author=moderator).delete()
+        stats = self.get_stats(client, title_id)
+        assert (stats['count'], stats['histogram']['7']) == (1, 0), (
+            'Проверьте, что счётчики обновляются и при удалении отзывов '
+            'в обход API.'
+        )
+
+    def test_03_first_review_without_rebuild(self, client, admin_client,
+                                             user_client, monkeypatch):
+        from reviews.models import TitleStats
+
+        def fail(*args, **kwargs):
+            raise AssertionError('rebuild() не должен вызываться')
+
+        monkeypatch.setattr(TitleStats, 'rebuild', fail)
+        title_id = create_reviews(admin_client, {})[1][0]['id']
+        create_single_review(user_client, title_id, 'Первый', 3)
+        stats = self.get_stats(client, title_id)
+        assert (stats['count'], stats['histogram']['3']) == (1, 1), (
+            'Проверьте, что строка статистики создаётся при первом '
+            'отзыве без полного пересчёта.'
+        )
+
+    def test_04_stale_instance(self, client, admin_client, admin):
+        from django.db import transaction
+
+        from reviews.models import Review
+
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        first = Review.objects.get(pk=reviews[0]['id'])
+        second = Review.objects.get(pk=reviews[0]['id'])
+        first.score = 9
+        first.save()
+        # Копия с устаревшей оценкой: её save() возвращает прежнюю оценку.
+        with transaction.atomic():
+            second.text = 'Новый текст'
+            second.save()
+        stats = self.get_stats(client, title_id)
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected[str(second.score)] = 1
+        assert stats['histogram'] == expected, (
+            'Проверьте, что рейтинг и гистограмма пересчитываются от оценки '
+            'в БД, а не от прочитанной при загрузке отзыва.'
+        )
+        assert (stats['count'], stats['sum']) == (1, second.score)
@@ -0,0 +1,63 @@
+from io import StringIO
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20CommentsCount:
+
+    def test_01_counter(self, client, admin_client, admin, user_client,
+                        user):
+        from django.core.management import call_command
+        from reviews.models import Review
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        counts = {
+            review['id']: review['comments_count']
+            for review in client.get(url).json()['results']
+        }
+        # create_comments комментирует только первый отзыв.
+        expected = {review['id']: 0 for review in reviews}
+        expected[reviews[0]['id']] = len(comments)
+        assert counts == expected, (
+            'Проверьте, что в ответе на запрос списка отзывов есть поле '
+            '`comments_count` с числом комментариев.'
+        )
+
+        review_id = reviews[0]['id']
+        response = admin_client.delete(
+            f'{url}{review_id}/comments/{comments[0]["id"]}/'
+        )
+        assert response.status_code == 204
+        detail = client.get(f'{url}{review_id}/').json()
+        assert detail['comments_count'] == expected[review_id] - 1, (
+            'Проверьте, что при удалении комментария счётчик уменьшается.'
+        )
+
+        Review.objects.update(comments_count=100)
+        out = StringIO()
+        call_command('rebuild_comment_counts', stdout=out)
+        assert f': {len(reviews)}.' in out.getvalue()
+        assert client.get(f'{url}{review_id}/').json() == detail, (
+            'Проверьте, что `rebuild_comment_counts` исправляет счётчики.'
+        )
+
+    def test_02_cascade_delete(self, client, admin_client, admin,
+                               user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        # Первый отзыв написал admin, комментарии к нему — admin и user.
+        review_url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                      f'{reviews[0]["id"]}/')
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert client.get(review_url).json()['comments_count'] == 1, (
+            'Проверьте, что счётчик уменьшается, когда комментарии '
+            'удаляются вместе с автором.'
+        )
@@ -0,0 +1,160 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories, create_genre
+
+
+def post_json(client, method, url, data):
+    return getattr(client, method)(
+        url, data=json.dumps(data), content_type='application/json'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Bulk:
+    url = '/api/v1/titles/bulk/'
+
+    def make_titles(self, count, genres, categories):
+        return [
+            {
+                'name': f'Произведение {i}',
+                'year': 1990 + i,
+                'genre': sorted(
+                    genre['slug'] for genre in genres[:i % 3 + 1]
+                ),
+                'category': categories[i % 2]['slug'],
+            }
+            for i in range(count)
+        ]
+
+    def test_01_bulk_create_titles(self, client, admin_client, user_client,
+                                   django_assert_max_num_queries):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = self.make_titles(20, genres, categories)
+
+        response = post_json(user_client, 'post', self.url, data)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что пакетная запись доступна только администратору.'
+        )
+        # begin + genres + categories + unique + insert + ids (SQLite)
+        # + genre links + search index + genres for the response
+        with django_assert_max_num_queries(9):
+            response = post_json(admin_client, 'post', self.url, data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос администратора к '
+            '`/api/v1/titles/bulk/` создаёт произведения.'
+        )
+        created = response.json()
+        assert [
+            {key: item[key] for key in data[0]} for item in created
+        ] == data
+        assert client.get('/api/v1/titles/').json()['count'] == 20, (
+            'Проверьте, что после пакетной записи сбрасывается кэш списка.'
+        )
+        found = client.get(
+            '/api/v1/search/', {'q': 'Произведение', 'type': 'title'}
+        ).json()
+        assert found['count'] == 20, (
+            'Проверьте, что созданные пакетом произведения индексируются.'
+        )
+
+        # Ошибка в одном объекте откатывает весь пакет.
+        more = self.make_titles(23, genres, categories)[20:]
+        more[1]['genre'] = ['unknown']
+        response = post_json(admin_client, 'post', self.url, more)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = post_json(admin_client, 'post', self.url, data[:1])
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пакетная запись проверяет уникальность.'
+        )
+        assert client.get('/api/v1/titles/').json()['count'] == 20
+
+    def test_02_bulk_update_and_delete(self, client, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = self.make_titles(3, genres, categories)
+        created = post_json(admin_client, 'post', self.url, data).json()
+
+        changes = [
+            {'id': created[0]['id'], 'name': 'Новое имя'},
+            {'id': created[1]['id'], 'genre': [genres[2]['slug']]},
+        ]
+        response = post_json(admin_client, 'patch', self.url, changes)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что PATCH-запрос администратора к '
+            '`/api/v1/titles/bulk/` обновляет произведения.'
+        )
+        detail = client.get(f'/api/v1/titles/{created[0]["id"]}/').json()
+        assert detail['name'] == 'Новое имя'
+        detail = client.get(f'/api/v1/titles/{created[1]["id"]}/').json()
+        assert [genre['slug'] for genre in detail['genre']] == [
+            genres[2]['slug']
+        ]
+
+        for method, duplicate in (
+            ('patch', [changes[0], {**changes[0], 'name': 'Другое имя'}]),
+            ('delete', [created[0]['id'], created[0]['id']]),
+        ):
+            response = post_json(admin_client, method, self.url, duplicate)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что пакет с повторяющимися id отклоняется.'
+            )
+            assert response.json() == [
+                {}, {'id': ['Значение повторяется в пакете.']}
+            ]
+
+        response = post_json(
+            admin_client, 'delete', self.url,
+            [created[0]['id'], created[1]['id']]
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get('/api/v1/titles/').json()['count'] == 1
+        response = post_json(
+            admin_client, 'delete', self.url, [created[0]['id']]
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_bulk_genres_and_categories(self, client, admin_client):
+        for url in ('/api/v1/genres/', '/api/v1/categories/'):
+            data = [
+                {'name': f'Раздел {i}', 'slug': f'section-{i}'}
+                for i in range(3)
+            ]
+            response = post_json(admin_client, 'post', f'{url}bulk/', data)
+            assert response.status_code == HTTPStatus.CREATED, (
+                f'Проверьте, что POST-запрос администратора к `{url}bulk/` '
+                'создаёт объекты.'
+            )
+            assert response.json() == data
+            assert client.get(url).json()['count'] == 3
+
+            duplicate = [{'name': 'Дубль', 'slug': 'dup'}] * 2
+            response = post_json(
+                admin_client, 'post', f'{url}bulk/', duplicate
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            errors = response.json()
+            assert isinstance(errors, list) and len(errors) == 2, (
+                'Проверьте, что ошибки пакета возвращаются списком по '
+                'объектам, как у ListSerializer.'
+            )
+            assert errors[0] == {} and 'slug' in errors[1]
+
+            response = post_json(
+                admin_client, 'delete', f'{url}bulk/',
+                ['section-0', 'section-1']
+            )
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            assert client.get(url).json()['count'] == 1
+
+            response = admin_client.post(
+                url, data={'name': 'Пакет', 'slug': 'bulk'}
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что POST-запрос к `{url}` со slug `bulk` '
+                'отклоняется: этот адрес занят пакетными операциями.'
+            )
+            assert 'slug' in response.json()
@@ -0,0 +1,117 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'auth': '3/min', 'reviews': '2/min', 'comments': '2/min'
+        },
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Throttling:
+
+    def test_01_auth(self, client, rates, monkeypatch):
+        from api import throttling
+
+        now = 1_000_000.0
+        monkeypatch.setattr(throttling.time, 'time', lambda: now)
+        url = '/api/v1/auth/signup/'
+        for i in range(3):
+            response = client.post(url, data={
+                'username': f'user{i}', 'email': f'user{i}@yamdb.fake'
+            })
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(url, data={
+            'username': 'user9', 'email': 'user9@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частые запросы к `/api/v1/auth/signup/` с '
+            'одного IP ограничиваются.'
+        )
+        assert int(response['Retry-After']) == 20
+
+        response = client.post(
+            url, data={'username': 'user9', 'email': 'user9@yamdb.fake'},
+            REMOTE_ADDR='10.0.0.2'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ограничение считается отдельно для каждого IP.'
+        )
+
+        now += 20
+        response = client.post('/api/v1/auth/token/', data={
+            'username': 'user0', 'confirmation_code': 'wrong'
+        })
+        assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что корзина пополняется со временем.'
+        )
+
+    def test_02_reviews_per_user(self, client, admin_client, admin,
+                                 user_client, user, rates):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        for _ in range(2):
+            response = user_client.post(url, data={'text': 'Комментарий'})
+            assert response.status_code == HTTPStatus.CREATED
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частая отправка комментариев ограничивается.'
+        )
+        for _ in range(5):
+            assert client.get(url).status_code == HTTPStatus.OK, (
+                'Проверьте, что чтение комментариев не ограничивается.'
+            )
+
+    @pytest.mark.parametrize('backend', ('locmem', 'shared'))
+    def test_03_concurrent_requests(self, backend, rates, monkeypatch):
+        import threading
+        import time
+
+        from django.core.cache.backends.locmem import LocMemCache
+        from django.test import RequestFactory
+
+        from api import throttling
+
+        if backend == 'shared':
+            # Общий кэш изображает LocMemCache, который не распознаётся
+            # как локальный: корзину защищает блокировка через add.
+            class SharedCache(LocMemCache):
+                pass
+
+            monkeypatch.setattr(throttling, 'LocMemCache', SharedCache)
+        original_get = LocMemCache.get
+
+        def slow_get(cache, key, *args, **kwargs):
+            value = original_get(cache, key, *args, **kwargs)
+            # Окно между чтением и записью корзины, в которое без
+            # блокировки успели бы все потоки.
+            time.sleep(0.02)
+            return value
+
+        monkeypatch.setattr(LocMemCache, 'get', slow_get)
+        view = type('View', (), {'throttle_scope': 'auth'})()
+        request = RequestFactory().post('/api/v1/auth/token/')
+        allowed = []
+
+        def check():
+            throttle = throttling.IPTokenBucketThrottle()
+            allowed.append(throttle.allow_request(request, view))
+
+        threads = [threading.Thread(target=check) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert allowed.count(True) == 3, (
+            'Проверьте, что параллельные запросы не превышают ставку '
+            'ограничения частоты.'
+        )
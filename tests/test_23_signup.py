@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Signup:
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_single_lookup(self, client, django_user_model, mailoutbox,
+                              monkeypatch, django_assert_max_num_queries):
+        from core import confirmation_codes, mail_queue
+
+        # Письма отправляем отдельно, чтобы считать только запросы signup.
+        monkeypatch.setattr(mail_queue, 'notify', lambda: None)
+        data = {'username': 'NewUser', 'email': 'new@yamdb.fake'}
+        # поиск пары + begin + insert + код + письмо в очередь
+        with django_assert_max_num_queries(5):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.OK
+
+        # поиск пары + новый код + письмо в очередь
+        with django_assert_max_num_queries(3):
+            response = client.post(self.url_signup, data={
+                'username': 'newuser', 'email': 'NEW@yamdb.fake'
+            })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторная регистрация сравнивает username и '
+            'email без учёта регистра.'
+        )
+        mail_queue.deliver_all()
+        user = django_user_model.objects.get(username='NewUser')
+        code = mailoutbox[-1].body.rsplit(' ', 1)[-1]
+        assert confirmation_codes.verify(user.pk, code), (
+            'Проверьте, что при повторной регистрации отправляется '
+            'действующий код подтверждения.'
+        )
+
+        for conflict in (
+            {'username': 'NEWUSER', 'email': 'other@yamdb.fake'},
+            {'username': 'other', 'email': 'New@Yamdb.Fake'},
+        ):
+            response = client.post(self.url_signup, data=conflict)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что username и email, занятые без учёта '
+                'регистра, отклоняются.'
+            )
+        assert django_user_model.objects.count() == 1
+
+    def test_02_case_insensitive_index(self, django_user_model):
+        django_user_model.objects.create_user('Someone', 'a@yamdb.fake')
+        with pytest.raises(IntegrityError):
+            django_user_model.objects.create_user('someone', 'b@yamdb.fake')
+
+    def test_03_load_data_case_insensitive(self, tmp_path, django_user_model):
+        import shutil
+        from io import StringIO
+
+        from django.conf import settings
+        from django.core.management import call_command
+
+        path = tmp_path / 'data'
+        shutil.copytree(settings.BASE_DIR / 'static' / 'data', path)
+        with open(path / 'users.csv', encoding='utf-8') as file:
+            users = len(file.readlines()) - 1
+        with open(path / 'users.csv', 'a', encoding='utf-8') as file:
+            file.write('999,BingoBongo,other@yamdb.fake,user,,,\n')
+            file.write('998,other,BINGOBONGO@yamdb.fake,user,,,\n')
+        call_command('load_data', path=path, stdout=StringIO())
+        assert django_user_model.objects.count() == users, (
+            'Проверьте, что `load_data` отклоняет пользователей, чьи '
+            'username или email совпадают с уже загруженными без учёта '
+            'регистра.'
+        )
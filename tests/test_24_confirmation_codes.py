@@ -0,0 +1,88 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ConfirmationCodes:
+    url_token = '/api/v1/auth/token/'
+
+    def test_01_hashed_and_single_use(self, user,
+                                      django_assert_max_num_queries):
+        from core import confirmation_codes
+        from reviews.models import ConfirmationCode
+
+        code = confirmation_codes.issue(user)
+        stored = ConfirmationCode.objects.get(user=user)
+        assert code not in stored.code_hash, (
+            'Проверьте, что в базе хранится только хэш кода.'
+        )
+        new_code = confirmation_codes.issue(user)
+        assert not confirmation_codes.verify(user.pk, code), (
+            'Проверьте, что новый код заменяет прежний.'
+        )
+        new_code = confirmation_codes.issue(user)
+        # запись читается из кэша, остаётся только удаление (begin + delete)
+        with django_assert_max_num_queries(2):
+            assert confirmation_codes.verify(user.pk, new_code)
+        assert not confirmation_codes.verify(user.pk, new_code), (
+            'Проверьте, что код погашается после успешной проверки.'
+        )
+        assert not ConfirmationCode.objects.filter(user=user).exists()
+
+    def test_02_attempts(self, client, user, settings):
+        from core import confirmation_codes
+
+        settings.CONFIRMATION_CODE_MAX_ATTEMPTS = 2
+        code = confirmation_codes.issue(user)
+        for _ in range(2):
+            response = client.post(self.url_token, data={
+                'username': user.username, 'confirmation_code': 'wrong'
+            })
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.url_token, data={
+            'username': user.username, 'confirmation_code': code
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что после исчерпания попыток код не принимается.'
+        )
+        code = confirmation_codes.issue(user)
+        response = client.post(self.url_token, data={
+            'username': user.username, 'confirmation_code': code
+        })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый код сбрасывает счётчик попыток.'
+        )
+
+    def test_03_expiry_and_sweep(self, user, admin, settings, monkeypatch):
+        from core import confirmation_codes
+        from reviews.models import ConfirmationCode
+
+        code = confirmation_codes.issue(user)
+        settings.CONFIRMATION_CODE_TTL = 2 * 24 * 60 * 60
+        confirmation_codes.issue(admin)
+        later = timezone.now() + timedelta(days=1, seconds=1)
+        monkeypatch.setattr(confirmation_codes.timezone, 'now', lambda: later)
+        assert not confirmation_codes.verify(user.pk, code), (
+            'Проверьте, что просроченный код не принимается.'
+        )
+        assert confirmation_codes.sweep() == 1
+        assert list(ConfirmationCode.objects.values_list(
+            'user_id', flat=True)) == [admin.pk], (
+            'Проверьте, что очистка удаляет только просроченные коды.'
+        )
+
+    def test_04_sent_mail_redacted(self, client, mailoutbox):
+        from reviews.models import QueuedMail
+
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'mailed', 'email': 'mailed@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert len(mailoutbox) == 1
+        mail = QueuedMail.objects.get()
+        assert mail.sent is not None and mail.message == '', (
+            'Проверьте, что после отправки код не остаётся в очереди писем.'
+        )
@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Token:
+    url_token = '/api/v1/auth/token/'
+
+    def test_01_single_lookup(self, client, user, monkeypatch,
+                              django_assert_num_queries):
+        from core import confirmation_codes
+        from core.custom_authentication import AuthenticationWithoutPassword
+
+        def fail(*args, **kwargs):
+            raise AssertionError('Бэкенды аутентификации не нужны.')
+
+        monkeypatch.setattr(
+            AuthenticationWithoutPassword, 'authenticate', fail
+        )
+        code = confirmation_codes.issue(user)
+        # пользователь + погашение кода (begin + delete); сам код
+        # читается из кэша
+        with django_assert_num_queries(3):
+            response = client.post(self.url_token, data={
+                'username': user.username, 'confirmation_code': code
+            })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что токен выдаётся по верному коду подтверждения.'
+        )
+        token = response.json()['token']
+        response = client.post(self.url_token, data={
+            'username': user.username, 'confirmation_code': code
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения нельзя использовать дважды.'
+        )
+        response = client.get(
+            '/api/v1/users/me/', HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        assert response.json()['username'] == user.username, (
+            'Проверьте, что выданный токен принадлежит пользователю.'
+        )
+
+    def test_02_unknown_user(self, client):
+        response = client.post(self.url_token, data={
+            'username': 'nobody', 'confirmation_code': 'code'
+        })
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_case_insensitive_username(self, client, mailoutbox):
+        from rest_framework_simplejwt.settings import api_settings
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        for username in ('Mixed', 'mixed'):
+            response = client.post('/api/v1/auth/signup/', data={
+                'username': username, 'email': 'mixed@yamdb.fake'
+            })
+            assert response.status_code == HTTPStatus.OK
+        code = mailoutbox[-1].body.rsplit(' ', 1)[-1]
+        response = client.post(self.url_token, data={
+            'username': 'mixed', 'confirmation_code': code
+        })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что токен выдаётся по username без учёта регистра, '
+            'как и при регистрации.'
+        )
+        token = AccessToken(response.json()['token'])
+        assert token[api_settings.USER_ID_CLAIM] == 'Mixed', (
+            'Проверьте, что в токене сохранённый username пользователя.'
+        )
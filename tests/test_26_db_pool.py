@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+
+class FakeConnection:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Test26DbPool:
+
+    def test_01_exhausted_pool_waits(self, monkeypatch):
+        psycopg2 = pytest.importorskip('psycopg2')
+        from core.db.backends.postgresql.base import BlockingConnectionPool
+
+        monkeypatch.setattr(psycopg2, 'connect',
+                            lambda *args, **kwargs: FakeConnection())
+        pool = BlockingConnectionPool(0, 1, timeout=0.05)
+        conn = pool.getconn()
+
+        result = {}
+
+        def take():
+            try:
+                result['conn'] = pool.getconn()
+            except psycopg2.OperationalError as error:
+                result['error'] = error
+
+        worker = threading.Thread(target=take)
+        worker.start()
+        worker.join(5)
+        assert 'conn' not in result and 'error' in result, (
+            'Проверьте, что при исчерпании пула поток ждёт не дольше '
+            'POOL_TIMEOUT и получает OperationalError.'
+        )
+
+        pool.timeout = 5
+        worker = threading.Thread(target=take)
+        worker.start()
+        pool.putconn(conn, close=True)
+        worker.join(5)
+        assert isinstance(result.get('conn'), FakeConnection), (
+            'Проверьте, что ожидающий поток получает соединение, как только '
+            'другое возвращается в пул.'
+        )